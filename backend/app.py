@@ -4,22 +4,46 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from .auth import decode_access_token
+from fastapi import Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import os
 import re
+import uuid
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from .models import Assignment, Quiz
-from .utils import extract_text_by_slide, create_session, get_session, sessions
+from .search import highlight_snippet, search_document, search_summaries_query
+from .slides import (
+    aget_slide,
+    aupdate_slide_bullets,
+    format_summary,
+    hydrate_snapshot,
+    slide_blob_rows,
+    summary_snapshot,
+)
+from .blobs import insert_blobs
+from .digest import adeck_digest, current_digest, deck_fingerprint, prebuild_digest
+from .dedupe import NEAR_DUPLICATES, find_near_duplicates
+from .intents import ASSIGNMENT, EXPLAIN_SLIDE, QUIZ, route
+from .utils import acreate_session, aget_session, get_session, sessions
 from .summarize import summarize_slide          
+from starlette.concurrency import run_in_threadpool
+from .uploads import UploadSizeLimit, extract_upload, spool_upload
 from .qa_model import (
     answer_question,
     explain_slide,
@@ -29,54 +53,51 @@ from .qa_model import (
 
           
 import logging
-from .database import Base, engine, get_db
+from .database import Base, SessionLocal, engine, get_async_db, get_db, pool_status
 from .models import Course, Summary, User, Assignment, Quiz
+from .caching import (
+    VersionedStaticFiles,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    render_index,
+    set_cache_headers,
+    watermark,
+)
+from . import metrics
+from .migrations import run_migrations
+from .export import MEDIA_TYPES, iter_csv, iter_file, write_xlsx
+from .profiling import PROFILE_ID_RE, SamplingProfiler, load_profile, profiling_allowed, save_profile
+from .tracing import new_request_id, request_id_var, span
+from .scheduler import BULK, INTERACTIVE, inference, rate_limiter
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
 from .schemas import (
     CourseCreate,
     CourseOut,
+    LectureItemOut,
+    LectureItemPage,
     LoginRequest,
+    SessionMeta,
     SummaryCreate,
+    SummaryListItem,
     SummaryOut,
+    SummaryPage,
+    SummarySearchHit,
+    SummarySearchPage,
     TokenResponse,
     UserCreate,
     UserOut,
 )
-from .auth import create_access_token, decode_access_token, get_password_hash, verify_password
+from .auth import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash_async,
+    user_cache,
+    verify_password_async,
+)
 logger = logging.getLogger("ai_lecture_app")
 logging.basicConfig(level=logging.INFO)
 
-SLIDE_RX = re.compile(r"(?:slide|page)\s*(?:no\.?|number|#)?\s*[:.-]?\s*(\d{1,3})", re.I)
-
-def extract_slide_number(message: str) -> int | None:
-    
-    if not message:
-        return None
-    
-    txt = message.lower()
-   
-    
-    m = SLIDE_RX.search(txt)
-    if m:
-        try:
-            n = int(m.group(1))
-            return n if 1 <= n <= 999 else None
-        except ValueError:
-            pass
-    
-    
-    fallback_pattern = re.compile(r"(?:slide|page).*?(\d{1,3})", re.I)
-    m = fallback_pattern.search(txt)
-    if m:
-        try:
-            n = int(m.group(1))
-            
-            if 1 <= n <= 999:
-                return n
-        except ValueError:
-            pass
-    
-    return None
-
 def pick_relevant_slides(question: str, slides: list[dict], k: int = 3) -> list[dict]:
     
     q = question or ""
@@ -126,14 +147,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Rejects oversized bodies, chunked ones included, before they are parsed and spooled.
+app.add_middleware(UploadSizeLimit)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = new_request_id(request.headers.get("x-request-id"))
+    token = request_id_var.set(request_id)
+    profiler = None
+    if profiling_allowed(request.headers.get("x-profile") or request.query_params.get("__profile")):
+        profiler = SamplingProfiler()
+        profiler.start()
+    try:
+        with span("request", method=request.method, path=request.url.path) as fields:
+            response = await call_next(request)
+            fields["status_code"] = response.status_code
+    finally:
+        if profiler:
+            profiler.stop()
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    if profiler:
+        profile_id = request_id if PROFILE_ID_RE.match(request_id) else uuid.uuid4().hex
+        await run_in_threadpool(save_profile, profile_id, profiler)
+        response.headers["X-Profile-Id"] = profile_id
+        logger.info("Saved profile %s (%d samples over %.3fs)", profile_id, profiler.samples, profiler.duration)
+    return response
+
 
 auth_scheme = HTTPBearer(auto_error=False)
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend")
-app.mount("/static", StaticFiles(directory=frontend_path), name="static")
+app.mount("/static", VersionedStaticFiles(directory=frontend_path), name="static")
 
 @app.get("/")
-async def serve_home():
-    return FileResponse(os.path.join(frontend_path, "index.html"))
+async def serve_home(request: Request):
+    return render_index(request, frontend_path)
 
 logging.basicConfig(level=logging.INFO)
 def get_current_user(
@@ -143,26 +193,26 @@ def get_current_user(
     return _resolve_user(credentials, db, required=True)
 
 @app.post("/api/auth/register", response_model=UserOut)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def register_user(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = (await db.execute(select(User.id).where(User.email == payload.email))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = User(
         email=payload.email,
         full_name=payload.full_name,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await get_password_hash_async(payload.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @app.post("/api/auth/login", response_model=TokenResponse)
-def login_user(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login_user(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+    if not user or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     token = create_access_token({"sub": user.email, "uid": str(user.id)})
@@ -181,7 +231,16 @@ def read_current_user(current_user: User = Depends(get_current_user)):
 
 
 @app.get("/api/courses", response_model=list[CourseOut])
-def list_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_courses(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    etag = make_etag("courses", current_user.id, watermark(db, Course, Course.owner_id == current_user.id))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
     courses = db.query(Course).filter(Course.owner_id == current_user.id).order_by(Course.created_at.desc()).all()
     return courses
 
@@ -217,13 +276,17 @@ def save_summary(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
+    sess = get_session(payload.session_id) if payload.session_id else None
     summary_text = payload.summary_text
     if not summary_text or not summary_text.strip():
-        sess = get_session(payload.session_id) if payload.session_id else None
         summary_text = (sess or {}).get("summary", "")
     if not summary_text:
         raise HTTPException(status_code=400, detail="Missing summary text")
 
+    slides = (sess or {}).get("slides") or payload.slides_payload
+    if not (isinstance(slides, list) and all(isinstance(s, dict) for s in slides)):
+        slides = None
+    # The summary keeps its own snapshot, frozen now; slide text is shared via slide_blobs.
     summary = Summary(
         user_id=current_user.id,
         course_id=payload.course_id,
@@ -231,25 +294,117 @@ def save_summary(
         source_filename=payload.source_filename,
         title=payload.title,
         summary_text=summary_text,
-        slides_payload=payload.slides_payload,
+        slides_payload=summary_snapshot(slides) if slides else payload.slides_payload,
+        slide_count=len(slides) if slides else None,
+        search_vector=search_document(payload.title, summary_text, slides or payload.slides_payload),
     )
+    if slides:
+        db.execute(insert_blobs(slide_blob_rows(slides)))
     db.add(summary)
     db.commit()
     db.refresh(summary)
-    return summary
+    return _summary_out(db, summary)
 
 
-@app.get("/api/summaries", response_model=list[SummaryOut])
+def _summary_out(db: Session, summary: Summary) -> dict:
+    slides = summary.slides_payload
+    if isinstance(slides, list):
+        slides = hydrate_snapshot(db, slides)
+    return {
+        "id": summary.id,
+        "course_id": summary.course_id,
+        "title": summary.title,
+        "summary_text": summary.summary_text,
+        "slides_payload": slides,
+        "created_at": summary.created_at,
+    }
+
+
+SUMMARY_LIST_COLUMNS = (
+    Summary.id,
+    Summary.course_id,
+    Summary.title,
+    Summary.source_filename,
+    Summary.slide_count,
+    Summary.created_at,
+)
+
+
+@app.get("/api/summaries", response_model=SummaryPage)
 def list_summaries(
+    request: Request,
+    response: Response,
     course_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Summary).filter(Summary.user_id == current_user.id)
+    filters = [Summary.user_id == current_user.id]
     if course_id:
-        query = query.filter(Summary.course_id == course_id)
-    summaries = query.order_by(Summary.created_at.desc()).all()
-    return summaries
+        filters.append(Summary.course_id == course_id)
+    etag = make_etag("summaries", current_user.id, course_id, cursor, limit, watermark(db, Summary, *filters))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+
+    # Metadata only: slides_payload and summary_text are fetched per summary.
+    query = db.query(*SUMMARY_LIST_COLUMNS).filter(*filters)
+    rows, next_cursor = keyset_page(query, Summary, cursor, limit)
+    return SummaryPage(
+        items=[SummaryListItem.model_validate(row, from_attributes=True) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@app.get("/api/summaries/search", response_model=SummarySearchPage)
+def search_summaries(
+    q: str = Query(..., min_length=1, max_length=200),
+    course_id: Optional[int] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    rows = db.execute(search_summaries_query(current_user.id, q, course_id, limit + 1, offset)).all()
+    has_more = len(rows) > limit
+    return SummarySearchPage(
+        items=[
+            SummarySearchHit.model_validate({**row._mapping, "snippet": highlight_snippet(row.snippet)})
+            for row in rows[:limit]
+        ],
+        next_offset=offset + limit if has_more else None,
+    )
+
+
+@app.get("/api/summaries/{summary_id}", response_model=SummaryOut)
+def read_summary(
+    summary_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    # Saved summaries are immutable, so (id, created_at) is a complete version.
+    version = (
+        db.query(Summary.created_at)
+        .filter(Summary.id == summary_id, Summary.user_id == current_user.id)
+        .scalar()
+    )
+    if version is None:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    etag = make_etag("summary", summary_id, version.isoformat())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    summary = (
+        db.query(Summary)
+        .filter(Summary.id == summary_id, Summary.user_id == current_user.id)
+        .first()
+    )
+    if not summary:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    return _summary_out(db, summary)
 
 
 
@@ -257,6 +412,7 @@ def list_summaries(
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 
 def _resolve_user(credentials: HTTPAuthorizationCredentials, db: Session, *, required: bool):
@@ -284,7 +440,12 @@ def _resolve_user(credentials: HTTPAuthorizationCredentials, db: Session, *, req
             detail="Invalid authentication token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.email == email).first()
+    uid = payload.get("uid")
+    user = user_cache.get(uid) if uid else None
+    if user is None or user.email != email:
+        user = db.query(User).filter(User.email == email).first()
+        if user:
+            user_cache.put(user)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -304,11 +465,27 @@ def get_optional_user(
     return _resolve_user(credentials, db, required=False)
 
 
+def admission_identity(
+    request: Request,
+    current_user: Optional[User] = Depends(get_optional_user),
+) -> str:
+    """The rate-limit key (user id, or client IP for guests) without charging it."""
+    if current_user:
+        return f"user:{current_user.id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def admission_key(key: str = Depends(admission_identity)) -> str:
+    """Rate-limit model-backed endpoints per user, or per client IP for guests."""
+    rate_limiter.check(key)
+    return key
+
+
 @app.post("/api/extract")
 async def extract_endpoint(
     file: UploadFile = File(...),
     credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     
     if not file.filename or not file.filename.lower().endswith(".pptx"):
@@ -318,44 +495,64 @@ async def extract_endpoint(
     
     current_user = None
     if credentials:
-        try:
-            payload = decode_access_token(credentials.credentials)
-            email = payload.get("sub")
-            if email:
-                current_user = db.query(User).filter(User.email == email).first()
-        except ValueError:
-            logger.warning("Invalid token in /api/extract")
-            current_user = None
-
-    
-    logger.info("Extracting slides from %s", file.filename)
-    slides = extract_text_by_slide(file.file)
+        with span("extract.resolve_user"):
+            try:
+                payload = decode_access_token(credentials.credentials)
+                email = payload.get("sub")
+                uid = payload.get("uid")
+                if email:
+                    current_user = user_cache.get(uid) if uid else None
+                    if current_user is None or current_user.email != email:
+                        current_user = (
+                            await db.execute(select(User).where(User.email == email))
+                        ).scalars().first()
+                        if current_user:
+                            user_cache.put(current_user)
+            except ValueError:
+                logger.warning("Invalid token in /api/extract")
+                current_user = None
 
     
+    with span("extract.spool_upload") as fields:
+        upload = await spool_upload(file)
+        fields["bytes"] = upload.size
+    logger.info("Extracting slides from %s (%d bytes, sha256=%s)", upload.filename, upload.size, upload.sha256)
+    try:
+        with span("extract.parse") as fields:
+            slides = await extract_upload(upload)
+            fields["slides"] = len(slides)
+    finally:
+        upload.close()
+
+    with span("extract.near_duplicates") as fields:
+        duplicates = await run_in_threadpool(find_near_duplicates, slides)
+        fields["duplicates"] = len(duplicates)
     slides_payload = [
         {
             "page": s["page"],
             "title": s["title"],
             "text": s["text"],
             "bullets": [],
+            **({"duplicate_of": duplicates[s["page"]]} if s["page"] in duplicates else {}),
         }
         for s in slides
     ]
 
     
-    sid = create_session(
-        " ".join(s["text"] for s in slides),
-        "",
-        slides_payload,
-        user_id=current_user.id if current_user else None,
-    )
+    with span("extract.create_session"):
+        sid = await acreate_session(
+            " ".join(s["text"] for s in slides),
+            "",
+            slides_payload,
+            user_id=current_user.id if current_user else None,
+        )
     logger.info("Created session %s with %d slides", sid, len(slides))
     
     return {
         "session_id": sid,
         "slides": [
-            {"page": s["page"], "title": s["title"], "text": s["text"]}
-            for s in slides
+            {k: s[k] for k in ("page", "title", "text", "duplicate_of") if k in s}
+            for s in slides_payload
         ],
     }
 
@@ -365,20 +562,170 @@ async def summarize_one(
     session_id: str = Form(...),
     page: int       = Form(...),
     title: str      = Form(""),
-    text: str       = Form(...)
+    text: str       = Form(...),
+    db: AsyncSession = Depends(get_async_db),
+    admission: str = Depends(admission_identity),
 ):
-    bullets = summarize_slide(text, ratio=0.65, max_bullets=10)
-    sess = get_session(session_id)
-    if sess is not None:
-        for sl in sess.setdefault("slides", []):
-            if sl.get("page") == page:
-                sl["bullets"] = bullets
-                break
-        section = f"🧾 **Slide {page}: {title}**\n" + "\n".join(f"• {b}" for b in bullets)
-        sess["summary"] = (sess.get("summary", "") + ("\n\n" if sess.get("summary") else "") + section)
+    sess = await aget_session(session_id)
+    if sess is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    by_page = {sl.get("page"): sl for sl in sess.get("slides", [])}
+    current = by_page.get(page) or {}
+    twin = by_page.get(current.get("duplicate_of")) if current.get("text") == text else None
+    if twin and twin.get("bullets"):
+        # near-duplicate of a slide that is already summarized
+        bullets = list(twin["bullets"])
+        NEAR_DUPLICATES.inc()
+    else:
+        twin = None
+        # A deck costs one token in total, the same as summarizing it through /api/chat;
+        # reused twins are free.
+        rate_limiter.check(admission, cost=1.0 / max(1, len(sess.get("slides", []))))
+        bullets = await inference.run(admission, BULK, summarize_slide, text, ratio=0.65, max_bullets=10)
+    # Single-row update; the rest of the deck is left untouched.
+    await aupdate_slide_bullets(db, session_id, page, bullets)
+    for sl in sess.setdefault("slides", []):
+        if sl.get("page") == page:
+            sl["bullets"] = bullets
+            break
+    section = f"🧾 **Slide {page}: {title}**\n" + "\n".join(f"• {b}" for b in bullets)
+    sess["summary"] = (sess.get("summary", "") + ("\n\n" if sess.get("summary") else "") + section)
+    if all(sl.get("bullets") for sl in sess["slides"]):
+        prebuild_digest(session_id, sess, admission)
+
+    result = {"page": page, "title": title, "bullets": bullets}
+    if twin:
+        result["duplicate_of"] = twin["page"]
+    return result
+
+
+
+async def _no_progress(stage: str, **fields):
+    pass
+
+
+async def chat_reply(session_id: str, sess: dict, message: str, admission: str, progress=_no_progress) -> dict:
+    """Answer one chat message against a loaded session.
+
+    Shared by POST /api/chat and the /ws/chat socket; `progress(stage, **fields)`
+    is awaited before the slow steps so streaming callers can report them.
+    """
+    slides = sess.get("slides", [])
+    with span("chat.route") as fields:
+        routed = route(message, slides)
+        fields.update(intent=routed.intent, page=routed.page, model_free=routed.answer is not None)
+    await progress("routed", intent=routed.intent, model_free=routed.answer is not None)
+
+    if routed.answer is not None:
+        sess.setdefault("chat_history", []).append({"user": message, "ai": routed.answer})
+        return {"response": routed.answer, "session_id": session_id}
+
+    if routed.intent == ASSIGNMENT:
+            await progress("digest")
+            with span("chat.digest"):
+                lecture_text = await adeck_digest(session_id, sess, admission) or sess.get("pptx_text") or ""
+            if not lecture_text:
+                ans = "⚠️ I don't have any lecture content yet. Upload and summarize a deck first."
+            else:
+                await progress("generating", intent=routed.intent)
+                with span("chat.generate_assignment"):
+                    assignment = await inference.run(admission, BULK, generate_assignment_from_lecture, lecture_text)
+                ans = f"📘 Assignment generated:\n\n{assignment}"
+            sess.setdefault("chat_history", []).append({"user": message, "ai": ans})
+            return {"response": ans, "session_id": session_id}
+
+    if routed.intent == QUIZ:
+            await progress("digest")
+            with span("chat.digest"):
+                lecture_text = await adeck_digest(session_id, sess, admission) or sess.get("pptx_text") or ""
+            if not lecture_text:
+                ans = "⚠️ I don't have any lecture content yet. Upload and summarize a deck first."
+            else:
+                await progress("generating", intent=routed.intent)
+                with span("chat.generate_quiz"):
+                    quiz = await inference.run(admission, BULK, generate_quiz_from_lecture, lecture_text)
+                ans = f"📝 Quiz generated:\n\n{quiz}"
+            sess.setdefault("chat_history", []).append({"user": message, "ai": ans})
+            return {"response": ans, "session_id": session_id}
 
-    return {"page": page, "title": title, "bullets": bullets}
+    
+    slide_num = routed.page
 
+    if routed.intent == EXPLAIN_SLIDE:
+        hit = next((s for s in slides if s["page"] == slide_num), None)
+        if hit:
+            
+            content = hit.get("text", "").strip()
+            title = hit.get("title", "")
+            
+            
+            if not content or len(content.split()) < 10:
+                if hit.get("bullets"):
+                    combined_content = f"{title}\n\n" + "\n".join(hit["bullets"])
+                    slide_context = f"Title: {title}\n\nContent: {combined_content}"
+                    explanation_prompt = "Provide a detailed explanation of this slide content. Explain what it teaches, what the key concepts mean, and how they relate to each other. Elaborate on each point with examples and context:"
+                    await progress("generating", intent=routed.intent, page=slide_num)
+                    with span("chat.explain_slide", page=slide_num):
+                        explanation = await inference.run(admission, INTERACTIVE, explain_slide, slide_context, explanation_prompt)
+                    response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
+                elif not content:
+                    response = f"📑 **Slide {hit['page']}: {title}**\n\n(This slide seems to be empty or contains only images.)"
+                else:
+                    
+                    slide_context = f"Title: {title}\n\nContent: {title}\n{content}"
+                    explanation_prompt = "Provide a detailed explanation of this slide. Explain what it teaches, what the key concepts mean, and how they relate to each other. Be thorough and detailed:"
+                    await progress("generating", intent=routed.intent, page=slide_num)
+                    with span("chat.explain_slide", page=slide_num):
+                        explanation = await inference.run(admission, INTERACTIVE, explain_slide, slide_context, explanation_prompt)
+                    response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
+            else:
+                
+                slide_context = f"Title: {title}\n\nContent: {content}"
+                explanation_prompt = "Provide a detailed explanation of this slide. Explain what it teaches, what the key concepts mean, and how they relate to each other. Do not just summarize - explain and elaborate on the meaning and significance. Be thorough and detailed:"
+                await progress("generating", intent=routed.intent, page=slide_num)
+                with span("chat.explain_slide", page=slide_num):
+                    explanation = await inference.run(admission, INTERACTIVE, explain_slide, slide_context, explanation_prompt)
+                response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
+            
+            sess.setdefault("chat_history", []).append({"user": message, "ai": response})
+            return {"response": response, "session_id": session_id}
+        else:
+             
+            response = f"⚠️ Slide {slide_num} not found. This deck has {len(slides)} slides."
+            sess.setdefault("chat_history", []).append({"user": message, "ai": response})
+            return {"response": response, "session_id": session_id}
+
+    
+    # Only a digest that is already up to date is used. Building it here would put
+    # one summarize call per section on this request, so a stale or missing digest
+    # is left to the background prebuild and the most relevant slides answer now.
+    digest = current_digest(sess) if slides else ""
+    top = None
+    if digest is None:
+        prebuild_digest(session_id, sess, admission)
+        top = pick_relevant_slides(message, slides)
+    if top:
+        context = "\n\n".join(
+            f"Slide {s.get('page')}: {s.get('title', '')}\n" + ("\n".join(s.get("bullets") or []) or s.get("text", ""))
+            for s in top
+        )[:6000]
+        pages_used = [s.get("page") for s in top if s.get("page") is not None]
+    elif digest:
+        context = digest
+        pages_used = []
+    else:
+        joined = "\n\n".join(
+            f"Slide {s.get('page')}: {s.get('title', '')}\n{s.get('text', '')}"
+            for s in slides
+        )
+        context = joined[:6000]
+        pages_used = [s.get("page") for s in slides if s.get("page") is not None]
+
+    await progress("generating", intent=routed.intent)
+    with span("chat.answer_question", context_chars=len(context)):
+        answer = await inference.run(admission, INTERACTIVE, answer_question, context, message)
+    sess.setdefault("chat_history", []).append({"user": message, "ai": answer})
+    return {"response": answer, "session_id": session_id, "used_slides": pages_used}
 
 
 @app.post("/api/chat")
@@ -388,7 +735,8 @@ async def chat_endpoint(
     course_id: Optional[int] = Form(default=None),
     file: Optional[UploadFile] = File(default=None),
     current_user: Optional[User] = Depends(get_optional_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    admission: str = Depends(admission_key),
 ):
     
     if course_id and not current_user:
@@ -398,32 +746,48 @@ async def chat_endpoint(
         if not file.filename.lower().endswith(".pptx"):
             return {"error": "Please upload a .pptx file"}
         
-        slides_raw = extract_text_by_slide(file.file)
+        with span("chat.spool_upload") as fields:
+            upload = await spool_upload(file)
+            fields["bytes"] = upload.size
+        try:
+            with span("chat.parse") as fields:
+                slides_raw = await extract_upload(upload)
+                fields["slides"] = len(slides_raw)
+        finally:
+            upload.close()
         slides_payload = []
-        for s in slides_raw:
-            txt = s["text"]
-            if not txt or len(txt.split()) < 12:
-                bullets = [s["title"]] if s["title"] else ["(No readable text)"]
-            else:
-                bullets = summarize_slide(txt, ratio=0.65, max_bullets=10)
-            slides_payload.append({
-                "page": s["page"], "title": s["title"], "text": s["text"], "bullets": bullets
-            })
+        duplicates = await run_in_threadpool(find_near_duplicates, slides_raw)
+        with span("chat.summarize_deck", slides=len(slides_raw), duplicates=len(duplicates)):
+            done = {}
+            for s in slides_raw:
+                txt = s["text"]
+                twin = done.get(duplicates.get(s["page"]))
+                if twin is not None:
+                    bullets = list(twin["bullets"])
+                    NEAR_DUPLICATES.inc()
+                elif not txt or len(txt.split()) < 12:
+                    bullets = [s["title"]] if s["title"] else ["(No readable text)"]
+                else:
+                    bullets = await inference.run(admission, BULK, summarize_slide, txt, ratio=0.65, max_bullets=10)
+                entry = {"page": s["page"], "title": s["title"], "text": s["text"], "bullets": bullets}
+                if twin is not None:
+                    entry["duplicate_of"] = twin["page"]
+                slides_payload.append(entry)
+                done[s["page"]] = entry
             
-        final_summary = "\n\n".join(
-            f"🧾 **Slide {sl['page']}: {sl['title']}**\n" + "\n".join(f"• {b}" for b in sl['bullets'])
-            for sl in slides_payload
-        )
+        final_summary = format_summary(slides_payload)
         
         
-        new_session_id = create_session(" ".join(s["text"] for s in slides_raw), final_summary, slides_payload)
+        with span("chat.create_session"):
+            new_session_id = await acreate_session(" ".join(s["text"] for s in slides_raw), final_summary, slides_payload)
+        prebuild_digest(new_session_id, sessions[new_session_id], admission)
         saved_summary_id = None
         if current_user and course_id:
             course = (
-                db.query(Course)
-                .filter(Course.id == course_id, Course.owner_id == current_user.id)
-                .first()
-            )
+                await db.execute(
+                    select(Course).where(Course.id == course_id, Course.owner_id == current_user.id)
+                )
+            ).scalars().first()
             if not course:
                 raise HTTPException(status_code=404, detail="Course not found")
             summary = Summary(
@@ -433,11 +797,15 @@ async def chat_endpoint(
                 source_filename=file.filename,
                 title=slides_payload[0]["title"] if slides_payload else None,
                 summary_text=final_summary,
-                slides_payload=slides_payload,
+                slide_count=len(slides_payload),
+                slides_payload=summary_snapshot(slides_payload),
+                search_vector=search_document(
+                    slides_payload[0]["title"] if slides_payload else None, final_summary, slides_payload
+                ),
             )
-            db.add(summary)
-            db.commit()
-            db.refresh(summary)
+            with span("chat.save_summary"):
+                db.add(summary)
+                await db.commit()
             saved_summary_id = summary.id
 
         return {
@@ -451,212 +819,361 @@ async def chat_endpoint(
     
     if not session_id:
         return {"error": "Session not found. Upload a PPTX first."}
-    sess = get_session(session_id)
+    with span("chat.load_session"):
+        sess = await aget_session(session_id)
     if not sess:
             return {"error": "Invalid session ID."}
 
-    lowered = message.strip().lower()
+    return await chat_reply(session_id, sess, message, admission)
 
-    if lowered.startswith("generate assignment"):
-            lecture_text = sess.get("summary") or sess.get("pptx_text") or ""
-            if not lecture_text:
-                ans = "⚠️ I don't have any lecture content yet. Upload and summarize a deck first."
-            else:
-                assignment = generate_assignment_from_lecture(lecture_text)
-                ans = f"📘 Assignment generated:\n\n{assignment}"
-            sess.setdefault("chat_history", []).append({"user": message, "ai": ans})
-            return {"response": ans, "session_id": session_id}
+WS_CHAT_MAX_PENDING = int(os.getenv("WS_CHAT_MAX_PENDING") or 8)
+WS_AUTH_TIMEOUT_SECONDS = 10
 
-    if lowered.startswith("generate quiz"):
-            lecture_text = sess.get("summary") or sess.get("pptx_text") or ""
-            if not lecture_text:
-                ans = "⚠️ I don't have any lecture content yet. Upload and summarize a deck first."
-            else:
-                quiz = generate_quiz_from_lecture(lecture_text)
-                ans = f"📝 Quiz generated:\n\n{quiz}"
-            sess.setdefault("chat_history", []).append({"user": message, "ai": ans})
-            return {"response": ans, "session_id": session_id}
+CHAT_SOCKETS = metrics.gauge("chat_websocket_connections", "Open /ws/chat connections.")
 
-    
-    slide_num = extract_slide_number(message)
-    slides = sess.get("slides", [])
 
-    if slide_num:
-        hit = next((s for s in slides if s["page"] == slide_num), None)
-        if hit:
-            
-            content = hit.get("text", "").strip()
-            title = hit.get("title", "")
-            
-            
-            if not content or len(content.split()) < 10:
-                if hit.get("bullets"):
-                    combined_content = f"{title}\n\n" + "\n".join(hit["bullets"])
-                    slide_context = f"Title: {title}\n\nContent: {combined_content}"
-                    explanation_prompt = "Provide a detailed explanation of this slide content. Explain what it teaches, what the key concepts mean, and how they relate to each other. Elaborate on each point with examples and context:"
-                    explanation = explain_slide(slide_context, explanation_prompt)
-                    response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
-                elif not content:
-                    response = f"📑 **Slide {hit['page']}: {title}**\n\n(This slide seems to be empty or contains only images.)"
-                else:
-                    
-                    slide_context = f"Title: {title}\n\nContent: {title}\n{content}"
-                    explanation_prompt = "Provide a detailed explanation of this slide. Explain what it teaches, what the key concepts mean, and how they relate to each other. Be thorough and detailed:"
-                    explanation = explain_slide(slide_context, explanation_prompt)
-                    response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
-            else:
-                
-                slide_context = f"Title: {title}\n\nContent: {content}"
-                explanation_prompt = "Provide a detailed explanation of this slide. Explain what it teaches, what the key concepts mean, and how they relate to each other. Do not just summarize - explain and elaborate on the meaning and significance. Be thorough and detailed:"
-                explanation = explain_slide(slide_context, explanation_prompt)
-                response = f"📑 **Slide {hit['page']}: {title}**\n\n{explanation}"
-            
-            sess.setdefault("chat_history", []).append({"user": message, "ai": response})
-            return {"response": response, "session_id": session_id}
-        else:
-             
-            response = f"⚠️ Slide {slide_num} not found. This deck has {len(slides)} slides."
-            sess.setdefault("chat_history", []).append({"user": message, "ai": response})
-            return {"response": response, "session_id": session_id}
+def _resolve_token(token: str) -> User:
+    db = SessionLocal()
+    try:
+        return _resolve_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db, required=True)
+    finally:
+        db.close()
 
-    
-    context = None
-    top = None
-    
-        # No specific slide matched – fall back to using the full summary as context
-    if not context:
-        summary_text = sess.get("summary", "") or ""
-        if summary_text:
-            # If very long, truncate to keep the model happy
-            if len(summary_text) > 6000:
-                summary_text = summary_text[:6000]
-            context = summary_text
-            pages_used = []
-        else:
-            joined = "\n\n".join(
-                f"Slide {s.get('page')}: {s.get('title', '')}\n{s.get('text', '')}"
-                for s in slides
-            )
-            context = joined[:6000]
-            pages_used = [s.get("page") for s in slides if s.get("page") is not None]
 
+@app.websocket("/ws/chat/{session_id}")
+async def chat_socket(websocket: WebSocket, session_id: str):
+    """Chat over one connection: auth and session lookup happen once, messages may be pipelined.
+
+    The client sends {"type": "auth", "token": <jwt or null>} first, then
+    {"type": "message", "id": ..., "message": ...} frames without waiting for
+    replies. Messages are answered in order; each gets "progress" frames and
+    then one "response" or "error" frame carrying its id.
+    """
+    await websocket.accept()
+    try:
+        hello = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT_SECONDS))
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, ValueError):
+        await websocket.close(code=4400, reason="Expected an auth frame")
+        return
+    if not isinstance(hello, dict) or hello.get("type") != "auth":
+        await websocket.close(code=4400, reason="Expected an auth frame")
+        return
+
+    current_user = None
+    if hello.get("token"):
+        try:
+            current_user = await run_in_threadpool(_resolve_token, str(hello["token"]))
+        except HTTPException as exc:
+            await websocket.close(code=4401, reason=str(exc.detail))
+            return
+    sess = await aget_session(session_id)
+    if not sess:
+        await websocket.close(code=4404, reason="Invalid session ID.")
+        return
+    if current_user:
+        admission = f"user:{current_user.id}"
     else:
-        # We used the 'top' slides for context
-        pages_used = [s.get("page") for s in top if s.get("page") is not None]
+        admission = f"ip:{websocket.client.host if websocket.client else 'unknown'}"
+
+    send_lock = asyncio.Lock()
+
+    async def send(frame: dict):
+        async with send_lock:
+            await websocket.send_json(frame)
+
+    pending: asyncio.Queue = asyncio.Queue(WS_CHAT_MAX_PENDING)
+
+    async def answer_messages():
+        while True:
+            message_id, message = await pending.get()
+
+            async def progress(stage: str, **fields):
+                await send({"type": "progress", "id": message_id, "stage": stage, **fields})
+
+            token = request_id_var.set(new_request_id(None))
+            error = None
+            try:
+                with span("ws.chat_message", session_id=session_id):
+                    rate_limiter.check(admission)
+                    reply = await chat_reply(session_id, sess, message, admission, progress)
+                await send({"type": "response", "id": message_id, **reply})
+            except HTTPException as exc:
+                error = {"type": "error", "id": message_id, "status": exc.status_code, "detail": exc.detail}
+            except Exception:
+                logger.exception("chat socket message failed")
+                error = {"type": "error", "id": message_id, "status": 500, "detail": "Internal server error"}
+            finally:
+                request_id_var.reset(token)
+            if error is None:
+                continue
+            try:
+                await send(error)
+            except Exception:
+                # the socket is unusable; close it so the client stops waiting on replies
+                logger.exception("chat socket could not send an error frame")
+                try:
+                    await websocket.close(code=1011, reason="Internal server error")
+                except Exception:
+                    pass
+                return
+
+    await send({"type": "ready", "session_id": session_id, "slides": len(sess.get("slides", []))})
+    CHAT_SOCKETS.inc()
+    worker = asyncio.create_task(answer_messages())
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                frame = json.loads(raw)
+            except ValueError:
+                frame = None
+            message_id = frame.get("id") if isinstance(frame, dict) else None
+            message = frame.get("message") if isinstance(frame, dict) else None
+            if not isinstance(message, str) or not message.strip():
+                await send({"type": "error", "id": message_id, "status": 400, "detail": "message is required"})
+                continue
+            try:
+                pending.put_nowait((message_id, message))
+            except asyncio.QueueFull:
+                await send({"type": "error", "id": message_id, "status": 429, "detail": "Too many pipelined messages."})
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # RuntimeError: the worker already closed the socket
+    finally:
+        worker.cancel()
+        CHAT_SOCKETS.dec()
+
+
+class LectureSource(BaseModel):
+    session_id: Optional[str] = None
+    session_text: Optional[str] = None  # older clients post the lecture text itself
+    regenerate: bool = False
+
+
+async def _lecture_source(body: LectureSource) -> tuple[dict | None, str]:
+    """The session (if any) and a hash identifying the lecture text, without building it."""
+    if not body.session_id:
+        return None, hashlib.sha256((body.session_text or "").encode("utf-8")).hexdigest()
+    sess = await aget_session(body.session_id)
+    if not sess:
+        raise HTTPException(status_code=404, detail="Session not found")
+    slides = sess.get("slides") or []
+    if slides:
+        return sess, deck_fingerprint(slides)
+    return sess, hashlib.sha256((sess.get("pptx_text") or "").encode("utf-8")).hexdigest()
 
-    answer = answer_question(context, message)
-    sess.setdefault("chat_history", []).append({"user": message, "ai": answer})
-    return {"response": answer, "session_id": session_id, "used_slides": pages_used}
 
-class SessionText(BaseModel):
-    session_text: str
+async def _lecture_text(body: LectureSource, sess: dict | None, admission: str) -> str:
+    if sess is None:
+        return body.session_text or ""
+    with span("lecture.digest"):
+        return await adeck_digest(body.session_id, sess, admission, BULK) or sess.get("pptx_text") or ""
 
-@app.post("/api/assignments/{course_id}")
-def create_assignment(
-    course_id: int,
-    body: SessionText,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    
 
-    lecture_text = body.session_text or ""
+async def _generate_course_item(model, generate, title: str, course_id: int, body: LectureSource, db, user, admission):
+    """Generate a quiz/assignment for a course, reusing the last one made from the same session text.
+
+    The cache is checked before the digest is built or a rate-limit token is
+    charged, so a hit costs neither a model call nor a token.
+    """
+    course = (
+        await db.execute(select(Course).where(Course.id == course_id, Course.owner_id == user.id))
+    ).scalars().first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    sess, source_hash = await _lecture_source(body)
+    if body.session_id and not body.regenerate:
+        cached = (
+            await db.execute(
+                select(model)
+                .where(model.course_id == course_id, model.session_id == body.session_id, model.source_hash == source_hash)
+                .order_by(model.created_at.desc())
+                .limit(1)
+            )
+        ).scalars().first()
+        if cached:
+            return {"id": cached.id, "title": cached.title, "content": cached.content, "cached": True}
+
+    rate_limiter.check(admission)
+    lecture_text = await _lecture_text(body, sess, admission)
     if not lecture_text.strip():
         raise HTTPException(status_code=400, detail="Empty lecture text")
 
-    content = generate_assignment_from_lecture(lecture_text)
-
-    assignment = Assignment(
+    with span(f"{model.__tablename__}.generate", chars=len(lecture_text)):
+        content = await inference.run(admission, BULK, generate, lecture_text)
+    item = model(
         course_id=course_id,
-        user_id=current_user.id,
-        title="Assignment from lecture",
+        user_id=user.id,
+        session_id=body.session_id,
+        source_hash=source_hash,
+        title=title,
         content=content,
     )
-    db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
-    return {"id": assignment.id, "title": assignment.title, "content": assignment.content}
+    db.add(item)
+    await db.commit()
+    return {"id": item.id, "title": item.title, "content": item.content, "cached": False}
 
 
+@app.post("/api/assignments/{course_id}")
+async def create_assignment(
+    course_id: int,
+    body: LectureSource,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    admission: str = Depends(admission_identity),
+):
+    return await _generate_course_item(
+        Assignment, generate_assignment_from_lecture, "Assignment from lecture",
+        course_id, body, db, current_user, admission,
+    )
 
 
 @app.post("/api/quizzes/{course_id}")
-def create_quiz(
+async def create_quiz(
     course_id: int,
-    body: SessionText,
-    db: Session = Depends(get_db),
+    body: LectureSource,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
+    admission: str = Depends(admission_identity),
 ):
-    lecture_text = body.session_text or ""
-    if not lecture_text.strip():
-        raise HTTPException(status_code=400, detail="Empty lecture text")
+    return await _generate_course_item(
+        Quiz, generate_quiz_from_lecture, "Quiz from lecture",
+        course_id, body, db, current_user, admission,
+    )
 
-    content = generate_quiz_from_lecture(lecture_text)
 
-    quiz = Quiz(
-        course_id=course_id,
-        user_id=current_user.id,
-        title="Quiz from lecture",
-        content=content,
+def _owned_course(db: Session, course_id: int, user: User) -> Course:
+    course = (
+        db.query(Course)
+        .filter(Course.id == course_id, Course.owner_id == user.id)
+        .first()
     )
-    db.add(quiz)
-    db.commit()
-    db.refresh(quiz)
-    return {"id": quiz.id, "title": quiz.title, "content": quiz.content}
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
 
 
+def _list_course_items(
+    request: Request,
+    response: Response,
+    db: Session,
+    model,
+    course_id: int,
+    cursor: Optional[str],
+    limit: int,
+):
+    etag = make_etag(model.__tablename__, course_id, cursor, limit, watermark(db, model, model.course_id == course_id))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    query = db.query(model.id, model.title, model.created_at).filter(model.course_id == course_id)
+    rows, next_cursor = keyset_page(query, model, cursor, limit)
+    return LectureItemPage(
+        items=[{"id": r.id, "title": r.title, "created_at": r.created_at} for r in rows],
+        next_cursor=next_cursor,
+    )
+
 
-@app.get("/api/courses/{course_id}/assignments")
+def _read_course_item(request: Request, response: Response, db: Session, model, course_id: int, item_id: int):
+    version = (
+        db.query(model.created_at)
+        .filter(model.id == item_id, model.course_id == course_id)
+        .first()
+    )
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    etag = make_etag(model.__tablename__, item_id, version.created_at.isoformat() if version.created_at else None)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    item = db.query(model).filter(model.id == item_id, model.course_id == course_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail=f"{model.__name__} not found")
+    return item
+
+
+@app.get("/api/courses/{course_id}/assignments", response_model=LectureItemPage)
 def list_assignments(
     course_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    course = (
-        db.query(Course)
-        .filter(Course.id == course_id, Course.owner_id == current_user.id)
-        .first()
-    )
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    course = _owned_course(db, course_id, current_user)
+    return _list_course_items(request, response, db, Assignment, course.id, cursor, limit)
 
-    assignments = (
-        db.query(Assignment)
-        .filter(Assignment.course_id == course.id)
-        .order_by(Assignment.created_at.desc())
-        .all()
-    )
-    return assignments
+
+@app.get("/api/courses/{course_id}/assignments/{assignment_id}", response_model=LectureItemOut)
+def read_assignment(
+    course_id: int,
+    assignment_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    course = _owned_course(db, course_id, current_user)
+    return _read_course_item(request, response, db, Assignment, course.id, assignment_id)
 
 
-@app.get("/api/courses/{course_id}/quizzes")
+@app.get("/api/courses/{course_id}/quizzes", response_model=LectureItemPage)
 def list_quizzes(
     course_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    course = (
-        db.query(Course)
-        .filter(Course.id == course_id, Course.owner_id == current_user.id)
-        .first()
-    )
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    course = _owned_course(db, course_id, current_user)
+    return _list_course_items(request, response, db, Quiz, course.id, cursor, limit)
+
 
-    quizzes = (
-        db.query(Quiz)
-        .filter(Quiz.course_id == course.id)
-        .order_by(Quiz.created_at.desc())
-        .all()
+@app.get("/api/courses/{course_id}/quizzes/{quiz_id}", response_model=LectureItemOut)
+def read_quiz(
+    course_id: int,
+    quiz_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    course = _owned_course(db, course_id, current_user)
+    return _read_course_item(request, response, db, Quiz, course.id, quiz_id)
+
+
+@app.get("/api/courses/{course_id}/export")
+def export_course(
+    course_id: int,
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    course = _owned_course(db, course_id, current_user)
+    if format == "csv":
+        body = iter_csv(course.id)
+    else:
+        body = iter_file(write_xlsx(course.id))
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="course-{course.id}-summaries.{format}"'},
     )
-    return quizzes
 
 
 
 
-@app.get("/api/debug/session/{session_id}")
-async def debug_session(session_id: str):
-    sess = get_session(session_id)
+@app.get("/api/debug/session/{session_id}", include_in_schema=False)
+async def debug_session(session_id: str, request: Request):
+    if not profiling_allowed(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Diagnostics are not enabled for this caller")
+    sess = await aget_session(session_id)
     if not sess:
         return {"error": "session not found"}
     return {
@@ -668,7 +1185,59 @@ async def debug_session(session_id: str):
     }
 
 
-@app.get("/api/debug/sessions")
-async def debug_sessions_list():
-    
+@app.get("/api/sessions/{session_id}", response_model=SessionMeta)
+async def read_session_meta(session_id: str):
+    sess = await aget_session(session_id)
+    if not sess:
+        raise HTTPException(status_code=404, detail="Session not found")
+    slides = sess.get("slides", [])
+    return SessionMeta(
+        session_id=session_id,
+        slide_count=len(slides),
+        summarized_slides=sum(1 for s in slides if s.get("bullets")),
+        chat_turns=len(sess.get("chat_history", [])),
+        has_digest=bool((sess.get("digest") or {}).get("text")),
+    )
+
+
+@app.get("/api/sessions/{session_id}/slides/{page}")
+async def read_session_slide(session_id: str, page: int, db: AsyncSession = Depends(get_async_db)):
+    sess = sessions.get(session_id)
+    if sess is not None:
+        hit = next((s for s in sess.get("slides", []) if s.get("page") == page), None)
+    else:
+        hit = await aget_slide(db, session_id, page)
+    if not hit:
+        raise HTTPException(status_code=404, detail="Slide not found")
+    return hit
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    if not metrics.metrics_allowed(request.headers.get("authorization")):
+        raise HTTPException(status_code=403, detail="Metrics are not enabled for this caller")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/debug/profiles/{profile_id}", include_in_schema=False)
+async def read_profile(profile_id: str, request: Request):
+    if not profiling_allowed(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled for this caller")
+    folded = load_profile(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(folded)
+
+
+@app.get("/api/debug/db-pool", include_in_schema=False)
+async def debug_db_pool(request: Request):
+    if not profiling_allowed(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Diagnostics are not enabled for this caller")
+    return pool_status()
+
+
+@app.get("/api/debug/sessions", include_in_schema=False)
+async def debug_sessions_list(request: Request):
+    if not profiling_allowed(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Diagnostics are not enabled for this caller")
     return {"sessions": list(sessions.keys())}
\ No newline at end of file
@@ -1,10 +1,19 @@
+import asyncio
 import os
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from .metrics import gauge
+from .models import User
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -12,6 +21,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY") or os.getenv("SECRET_KEY") or "dev-secret-change-me"
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS") or 60)
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES") or 10000)
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS") or 2)
+
+# bcrypt is deliberately slow; keep it off the event loop and out of the shared
+# threadpool so a burst of logins cannot starve ordinary requests.
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
 
 
 def get_password_hash(password: str) -> str:
@@ -22,6 +38,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
+
+
+def bcrypt_queue_depth() -> int:
+    return _bcrypt_executor._work_queue.qsize()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -36,3 +66,69 @@ def decode_access_token(token: str) -> dict:
         raise ValueError("Invalid token") from exc
 
 
+
+
+class UserCache:
+    """Short-lived per-process cache of resolved users, keyed by the token's uid."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, uid: str) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[uid]
+                self.misses += 1
+                return None
+            self.hits += 1
+            values = entry[1]
+        # Hand out a fresh detached instance so requests never share ORM state.
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User):
+        if self.ttl_seconds <= 0:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[str(user.id)] = (time.monotonic() + self.ttl_seconds, values)
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def invalidate(self, uid):
+        with self._lock:
+            self._entries.pop(str(uid), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES)
+
+gauge("bcrypt_executor_queue_depth", "Password hash/verify jobs waiting for a bcrypt worker.", fn=bcrypt_queue_depth)
+gauge(
+    "cache_hit_ratio",
+    "Hit ratio of in-process caches since startup.",
+    ("cache",),
+    fn=lambda: {"user": user_cache.hit_ratio()},
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
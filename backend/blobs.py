@@ -0,0 +1,80 @@
+"""Slide text stored once per content hash, compressed when large.
+
+A slides row keeps its title, bullets and content_hash; the text lives in
+slide_blobs under that hash, so the same deck uploaded twice (or a summary
+and its session) share one copy. zstd is used when the optional `zstandard`
+package is installed, zlib otherwise; rows record their codec so both stay
+readable.
+"""
+
+import os
+import zlib
+
+from sqlalchemy import text as sql
+from sqlalchemy.dialects.postgresql import insert
+
+from .models import SlideBlob
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+BLOB_COMPRESS_MIN_BYTES = int(os.getenv("BLOB_COMPRESS_MIN_BYTES") or 256)
+BLOB_CODEC = CODEC_ZSTD if zstandard is not None and os.getenv("BLOB_CODEC", "zstd") == "zstd" else CODEC_ZLIB
+ZSTD_LEVEL = 6
+MIGRATION_BATCH = 500
+
+
+def encode(text: str) -> tuple[int, bytes]:
+    raw = (text or "").encode("utf-8")
+    if len(raw) < BLOB_COMPRESS_MIN_BYTES:
+        return CODEC_RAW, raw
+    if BLOB_CODEC == CODEC_ZSTD:
+        packed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        packed = zlib.compress(raw, 6)
+    if len(packed) >= len(raw):
+        return CODEC_RAW, raw
+    return BLOB_CODEC, packed
+
+
+def decode(codec: int, data: bytes) -> str:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("slide text is zstd-compressed but the zstandard package is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == CODEC_ZLIB:
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def blob_row(content_hash: str, text: str) -> dict:
+    codec, data = encode(text)
+    return {"content_hash": content_hash, "codec": codec, "data": data, "raw_size": len((text or "").encode("utf-8"))}
+
+
+def insert_blobs(rows: list[dict]):
+    """INSERT for blob rows; hashes already stored are left alone."""
+    unique = list({r["content_hash"]: r for r in rows}.values())
+    return insert(SlideBlob).values(unique).on_conflict_do_nothing(index_elements=["content_hash"])
+
+
+def migrate_slide_text(conn):
+    """Move slide text still stored inline on slides rows into slide_blobs."""
+    while True:
+        rows = conn.execute(sql(
+            "SELECT session_id, page, content_hash, text FROM slides WHERE text IS NOT NULL LIMIT :n"
+        ), {"n": MIGRATION_BATCH}).all()
+        if not rows:
+            return
+        conn.execute(insert_blobs([blob_row(r.content_hash, r.text) for r in rows]))
+        conn.execute(
+            sql("UPDATE slides SET text = NULL WHERE session_id = :sid AND page = :page"),
+            [{"sid": r.session_id, "page": r.page} for r in rows],
+        )
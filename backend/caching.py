@@ -0,0 +1,104 @@
+import hashlib
+import os
+import re
+
+from fastapi import Request, Response
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from sqlalchemy import func
+
+
+PRIVATE_REVALIDATE = "private, no-cache"
+PUBLIC_REVALIDATE = "no-cache"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+STATIC_REF_RE = re.compile(r'(src|href)="/static/([^"?#]+)"')
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from a resource version, not from the response body."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def watermark(db, model, *filters) -> tuple:
+    """(row count, newest created_at, highest id) for the rows matching `filters`.
+
+    Rows are only ever inserted, so this changes whenever the listing would.
+    """
+    count, newest, top_id = (
+        db.query(func.count(model.id), func.max(model.created_at), func.max(model.id))
+        .filter(*filters)
+        .one()
+    )
+    return count, newest.isoformat() if newest else None, top_id
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"},
+    )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = PRIVATE_REVALIDATE):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Authorization"
+
+
+_file_hashes: dict[str, tuple[tuple, str]] = {}
+
+
+def asset_version(path: str) -> str:
+    """Short content hash for a static file, recomputed only when it changes on disk."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as fh:
+        version = hashlib.sha256(fh.read()).hexdigest()[:12]
+    _file_hashes[path] = (key, version)
+    return version
+
+
+class VersionedStaticFiles(StaticFiles):
+    """Static files that are cached forever when requested with their current `?v=<hash>`."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        query = scope.get("query_string", b"").decode("latin-1")
+        requested = dict(p.partition("=")[::2] for p in query.split("&") if p).get("v")
+        if requested and requested == asset_version(full_path):
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = PUBLIC_REVALIDATE
+        return response
+
+
+def render_index(request: Request, frontend_path: str) -> Response:
+    """Serve index.html with static references pinned to their content hash."""
+    index_path = os.path.join(frontend_path, "index.html")
+    with open(index_path, encoding="utf-8") as fh:
+        html = fh.read()
+
+    def _pin(match):
+        asset = os.path.join(frontend_path, match.group(2))
+        if not os.path.isfile(asset):
+            return match.group(0)
+        return f'{match.group(1)}="/static/{match.group(2)}?v={asset_version(asset)}"'
+
+    html = STATIC_REF_RE.sub(_pin, html)
+    etag = make_etag("index", html)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": PUBLIC_REVALIDATE})
+    return HTMLResponse(html, headers={"ETag": etag, "Cache-Control": PUBLIC_REVALIDATE})
@@ -0,0 +1,72 @@
+"""Near-duplicate slide detection (word shingles, MinHash and LSH banding).
+
+Decks repeat agenda and recap slides and lightly edited copies. A slide whose
+shingle Jaccard similarity to an earlier slide reaches NEAR_DUP_THRESHOLD is
+mapped to that earlier twin, so it can reuse the twin's bullets instead of
+being summarized again.
+"""
+
+import hashlib
+import os
+import random
+import re
+from collections import defaultdict
+
+from .metrics import counter
+
+
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD") or 0.8)
+SHINGLE_WORDS = int(os.getenv("NEAR_DUP_SHINGLE_WORDS") or 2)
+MINHASH_PERMUTATIONS = 64
+LSH_ROWS = 4  # 16 bands of 4 rows: pairs at 0.8 similarity collide with p > 0.999
+MIN_SHINGLES = 4
+
+NEAR_DUPLICATES = counter("near_duplicate_slides_total", "Slides that reused the bullets of an earlier near-duplicate.")
+
+_WORD_RE = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(MINHASH_PERMUTATIONS)]
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def signature(shingle_set: set[str]) -> tuple[int, ...]:
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingle_set]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def find_near_duplicates(slides: list[dict], threshold: float = NEAR_DUP_THRESHOLD) -> dict[int, int]:
+    """Map page -> page of its earliest near-duplicate; pages without one are absent.
+
+    MinHash bands only propose candidates; the exact shingle Jaccard decides.
+    """
+    if threshold <= 0 or threshold > 1:
+        return {}
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    seen: dict[int, set[str]] = {}
+    duplicates: dict[int, int] = {}
+    for s in sorted(slides, key=lambda s: s["page"]):
+        sh = shingles(f"{s.get('title') or ''} {s.get('text') or ''}")
+        if len(sh) < MIN_SHINGLES:
+            continue
+        sig = signature(sh)
+        keys = [(i, sig[i:i + LSH_ROWS]) for i in range(0, MINHASH_PERMUTATIONS, LSH_ROWS)]
+        candidates = sorted({page for key in keys for page in buckets.get(key, ())})
+        for page in candidates:
+            if jaccard(sh, seen[page]) >= threshold:
+                duplicates[s["page"]] = duplicates.get(page, page)
+                break
+        seen[s["page"]] = sh
+        for key in keys:
+            buckets[key].append(s["page"])
+    return duplicates
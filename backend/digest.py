@@ -0,0 +1,196 @@
+"""Hierarchical deck digest: slide bullets -> section summaries -> a short deck digest.
+
+Every summary node is cached under the sha256 of its input text, so after one
+slide's bullets change only that slide's section (and the few reduce nodes
+above it) is summarized again. The cache and the digest text are persisted on
+the lecture session so they survive restarts.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import weakref
+
+from sqlalchemy import update
+
+from .database import AsyncSessionLocal
+from .metrics import STAGE_SECONDS
+from .models import LectureSession
+from .scheduler import BACKGROUND, INTERACTIVE, PRIORITIES, inference
+from .summarize import summarize_slide
+
+
+DIGEST_SECTION_SLIDES = int(os.getenv("DIGEST_SECTION_SLIDES") or 6)
+DIGEST_MAX_CHARS = int(os.getenv("DIGEST_MAX_CHARS") or 2000)
+DIGEST_GROUP_CHARS = 3000
+DIGEST_MAX_LEVELS = 3
+# A slide with a title and at most this many body words starts a new section.
+DIVIDER_MAX_WORDS = 8
+
+logger = logging.getLogger("ai_lecture_app")
+
+
+def split_sections(slides: list[dict]) -> list[list[dict]]:
+    """Group consecutive slides, starting a section at divider slides or every DIGEST_SECTION_SLIDES.
+
+    Boundaries depend only on titles and slide text, never on bullets, so
+    re-summarizing a slide cannot move them.
+    """
+    sections: list[list[dict]] = []
+    for s in sorted(slides, key=lambda s: s.get("page") or 0):
+        divider = bool(s.get("title")) and len((s.get("text") or "").split()) <= DIVIDER_MAX_WORDS
+        if not sections or len(sections[-1]) >= DIGEST_SECTION_SLIDES or (divider and len(sections[-1]) > 1):
+            sections.append([])
+        sections[-1].append(s)
+    return sections
+
+
+def section_text(section: list[dict]) -> str:
+    parts = []
+    for s in section:
+        body = " ".join(s.get("bullets") or []) or (s.get("text") or "")
+        parts.append(f"{s.get('title') or ''}. {body}".strip())
+    return "\n".join(parts)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def deck_fingerprint(slides: list[dict]) -> str:
+    """Identifies the digest input; equal fingerprints give the same digest without a model call."""
+    return _text_hash("\n\n".join(section_text(s) for s in split_sections(slides)))
+
+
+def _label(section: list[dict]) -> str:
+    first, last = section[0].get("page"), section[-1].get("page")
+    pages = f"Slide {first}" if first == last else f"Slides {first}-{last}"
+    title = section[0].get("title")
+    return f"{pages} ({title})" if title else pages
+
+
+def _groups(lines: list[str], max_chars: int) -> list[str]:
+    groups, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) > max_chars:
+            groups.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        groups.append("\n".join(current))
+    return groups
+
+
+class _Summaries:
+    """Summary lookups against the session's cache; misses go through the inference scheduler.
+
+    `priority` may be raised while a build is running (see adeck_digest), so a
+    background prebuild speeds up once a user is waiting on it.
+    """
+
+    def __init__(self, cache: dict, key: str, priority: str):
+        self.old = cache
+        self.used: dict[str, str] = {}
+        self.key = key
+        self.priority = priority
+
+    async def get(self, text: str, ratio: float, max_bullets: int) -> str:
+        h = _text_hash(text)
+        summary = self.used.get(h) or self.old.get(h)
+        if summary is None:
+            bullets = await inference.run(
+                self.key, self.priority, summarize_slide, text, ratio=ratio, max_bullets=max_bullets
+            )
+            summary = " ".join(bullets)
+        self.used[h] = summary
+        return summary
+
+
+async def build_digest(slides: list[dict], summaries: _Summaries) -> tuple[str, dict]:
+    """Return the digest and the cache entries it used (stale nodes drop out)."""
+    lines = []
+    for section in split_sections(slides):
+        text = section_text(section)
+        if text:
+            lines.append(f"{_label(section)}: {await summaries.get(text, ratio=0.35, max_bullets=4)}")
+    digest = "\n".join(lines)
+
+    level = 0
+    while len(digest) > DIGEST_MAX_CHARS and level < DIGEST_MAX_LEVELS:
+        reduced = [await summaries.get(g, ratio=0.3, max_bullets=5) for g in _groups(digest.split("\n"), DIGEST_GROUP_CHARS)]
+        digest = "\n".join(reduced)
+        level += 1
+    if len(digest) > DIGEST_MAX_CHARS:
+        digest = digest[:DIGEST_MAX_CHARS].rsplit(" ", 1)[0] + " …"
+    return digest, summaries.used
+
+
+# Per-session state lives here rather than in the session dict, which is plain data.
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_building: dict[str, _Summaries] = {}
+_prebuilds: dict[str, asyncio.Task] = {}
+
+
+def _lock_for(session_id: str) -> asyncio.Lock:
+    lock = _locks.get(session_id)
+    if lock is None:
+        lock = _locks[session_id] = asyncio.Lock()
+    return lock
+
+
+async def adeck_digest(session_id: str, sess: dict, key: str, priority: str = INTERACTIVE) -> str:
+    """Bring the session's digest up to date with its slides and return it.
+
+    On-demand callers use their own (interactive) priority; if a prebuild is
+    already running, its remaining model calls are promoted to that priority.
+    """
+    running = _building.get(session_id)
+    if running is not None and PRIORITIES.index(priority) < PRIORITIES.index(running.priority):
+        running.priority = priority
+    async with _lock_for(session_id):
+        stored = sess.get("digest") or {}
+        slides = sess.get("slides") or []
+        fingerprint = deck_fingerprint(slides)
+        if stored.get("fingerprint") == fingerprint:
+            return stored.get("text", "")
+
+        summaries = _building[session_id] = _Summaries(stored.get("cache") or {}, key, priority)
+        try:
+            with STAGE_SECONDS.time(stage="deck_digest"):
+                text, cache = await build_digest(slides, summaries)
+        finally:
+            _building.pop(session_id, None)
+        stored = {"fingerprint": fingerprint, "text": text, "cache": cache}
+        sess["digest"] = stored
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(LectureSession).where(LectureSession.id == session_id).values(digest=stored)
+            )
+            await db.commit()
+        return text
+
+
+def current_digest(sess: dict) -> str | None:
+    """The stored digest if it is up to date with the session's slides, else None; never calls a model."""
+    stored = sess.get("digest") or {}
+    if stored.get("fingerprint") != deck_fingerprint(sess.get("slides") or []):
+        return None
+    return stored.get("text", "")
+
+
+def prebuild_digest(session_id: str, sess: dict, key: str):
+    """Refresh the digest in the background once a deck's bullets are in place."""
+    if session_id in _prebuilds:
+        return
+
+    async def run():
+        try:
+            await adeck_digest(session_id, sess, key, BACKGROUND)
+        except Exception:
+            logger.exception("digest prebuild failed for session %s", session_id)
+        finally:
+            _prebuilds.pop(session_id, None)
+
+    _prebuilds[session_id] = asyncio.create_task(run())
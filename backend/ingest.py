@@ -0,0 +1,294 @@
+"""Offline bulk ingestion of lecture decks.
+
+    python -m backend.ingest /srv/decks --owner prof@example.edu
+    python -m backend.ingest /srv/decks/cs101 --owner prof@example.edu --course-id 12
+
+Each sub-folder of ROOT is a course, created for the owner if missing, unless
+--course-id puts every deck into one course. Decks are parsed in a process
+pool while the main process summarizes slides in batches and bulk-inserts
+sessions, slides and summaries one batch per transaction. Finished decks are
+appended to a manifest, so an interrupted run picks up where it stopped.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .pptx_text import extract_text_by_slide
+
+
+MANIFEST_NAME = ".ingest-manifest.jsonl"
+# Same threshold as the chat upload path: shorter slides keep their title as the bullet.
+MIN_SUMMARY_WORDS = 12
+
+
+def _extract(path: str) -> dict:
+    """Runs in a pool worker; imports nothing that loads models or opens the database."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        return {
+            "path": path,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "slides": extract_text_by_slide(io.BytesIO(data)),
+        }
+    except Exception as exc:
+        return {"path": path, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def find_decks(root: str, one_course: bool) -> list[tuple[str, str | None]]:
+    """(path, course folder name) for every .pptx under root."""
+    decks = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root)
+        course = None if one_course or rel == "." else rel.split(os.sep)[0]
+        for name in sorted(filenames):
+            if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                decks.append((os.path.join(dirpath, name), course))
+    return decks
+
+
+class Manifest:
+    def __init__(self, path: str):
+        self.path = path
+        self.done: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a torn last line from an interrupted run
+                    if "summary_id" in entry:
+                        self.done[entry["path"]] = entry
+        self._fh = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def stamp(path: str) -> dict:
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def is_done(self, rel: str, path: str) -> bool:
+        entry = self.done.get(rel)
+        return entry is not None and all(entry.get(k) == v for k, v in self.stamp(path).items())
+
+    def record(self, entries: list[dict]):
+        for entry in entries:
+            self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self):
+        self._fh.close()
+
+
+class Ingester:
+    def __init__(self, db, owner, course_id: int | None, batch_size: int):
+        self.db = db
+        self.owner = owner
+        self.course_id = course_id
+        self.batch_size = batch_size
+        self._courses: dict[str, int] = {}
+
+    def course_for(self, name: str | None) -> int:
+        from .models import Course
+
+        if name is None:
+            return self.course_id
+        if name not in self._courses:
+            course = self.db.query(Course).filter(Course.owner_id == self.owner.id, Course.name == name).first()
+            if course is None:
+                course = Course(owner_id=self.owner.id, name=name)
+                self.db.add(course)
+                self.db.commit()
+            self._courses[name] = course.id
+        return self._courses[name]
+
+    def flush(self, decks: list[dict]) -> list[dict]:
+        """Summarize and insert a batch of extracted decks; returns their manifest entries."""
+        from sqlalchemy import insert
+
+        from .blobs import insert_blobs
+        from .dedupe import NEAR_DUPLICATES, find_near_duplicates
+        from .models import LectureSession, Slide, Summary
+        from .search import search_document_params, search_params
+        from .slides import format_summary, slide_blob_rows, slide_rows, summary_snapshot
+        from .summarize import summarize_slides
+
+        for d in decks:
+            d["duplicates"] = find_near_duplicates(d["slides"])
+        todo = [
+            (d, i) for d in decks for i, s in enumerate(d["slides"])
+            if s["text"] and len(s["text"].split()) >= MIN_SUMMARY_WORDS and s["page"] not in d["duplicates"]
+        ]
+        bullets = summarize_slides([d["slides"][i]["text"] for d, i in todo], batch_size=self.batch_size)
+        for (d, i), b in zip(todo, bullets):
+            d["slides"][i]["bullets"] = b
+
+        sessions, slides, blobs, summaries = [], [], [], []
+        for d in decks:
+            payload, by_page = [], {}
+            for s in d["slides"]:
+                twin = by_page.get(d["duplicates"].get(s["page"]))
+                entry = {
+                    "page": s["page"],
+                    "title": s["title"],
+                    "text": s["text"],
+                    "bullets": s.get("bullets") or ([s["title"]] if s["title"] else ["(No readable text)"]),
+                }
+                if twin is not None:
+                    entry["bullets"] = list(twin["bullets"])
+                    entry["duplicate_of"] = twin["page"]
+                    NEAR_DUPLICATES.inc()
+                payload.append(entry)
+                by_page[s["page"]] = entry
+            summary_text = format_summary(payload)
+            title = payload[0]["title"] if payload else None
+            d["session_id"] = str(uuid.uuid4())
+            sessions.append({"id": d["session_id"], "user_id": self.owner.id})
+            slides.extend(slide_rows(d["session_id"], payload))
+            blobs.extend(slide_blob_rows(payload))
+            summaries.append({
+                "user_id": self.owner.id,
+                "course_id": d["course_id"],
+                "session_id": d["session_id"],
+                "source_filename": os.path.basename(d["path"]),
+                "title": title,
+                "summary_text": summary_text,
+                "slide_count": len(payload),
+                "slides_payload": summary_snapshot(payload),
+                **search_params(title, summary_text, payload),
+            })
+
+        try:
+            self.db.execute(insert(LectureSession), sessions)
+            if slides:
+                self.db.execute(insert_blobs(blobs))
+                self.db.execute(insert(Slide), slides)
+            table = Summary.__table__
+            ids = self.db.execute(
+                insert(table)
+                .values(search_vector=search_document_params())
+                .returning(table.c.id, sort_by_parameter_order=True),
+                summaries,
+            ).scalars().all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return [
+            {
+                "path": d["rel"],
+                **d["stamp"],
+                "sha256": d["sha256"],
+                "session_id": d["session_id"],
+                "summary_id": summary_id,
+            }
+            for d, summary_id in zip(decks, ids)
+        ]
+
+
+def run(args) -> int:
+    from .database import SessionLocal
+    from .models import Course, User
+
+    root = os.path.abspath(args.root)
+    manifest = Manifest(args.manifest or os.path.join(root, MANIFEST_NAME))
+    db = SessionLocal()
+    try:
+        owner = db.query(User).filter(User.email == args.owner).first()
+        if owner is None:
+            print(f"no user with email {args.owner}", file=sys.stderr)
+            return 2
+        if args.course_id is not None:
+            course = db.query(Course).filter(Course.id == args.course_id, Course.owner_id == owner.id).first()
+            if course is None:
+                print(f"course {args.course_id} not found for {args.owner}", file=sys.stderr)
+                return 2
+        ingester = Ingester(db, owner, args.course_id, args.batch_size)
+
+        decks = find_decks(root, one_course=args.course_id is not None)
+        todo = [(p, c) for p, c in decks if not manifest.is_done(os.path.relpath(p, root), p)]
+        loose = [p for p, c in todo if c is None and args.course_id is None]
+        if loose:
+            print(f"skipping {len(loose)} deck(s) directly under {root}; use --course-id", file=sys.stderr)
+            todo = [(p, c) for p, c in todo if not (c is None and args.course_id is None)]
+        print(f"{len(decks)} decks found, {len(decks) - len(todo) - len(loose)} already ingested, {len(todo)} to go")
+
+        course_of = {p: c for p, c in todo}
+        queue = iter(todo)
+        started = time.perf_counter()
+        done_decks = done_slides = failed = 0
+        batch, batch_slides = [], 0
+
+        def flush():
+            nonlocal batch, batch_slides, done_decks, done_slides
+            if not batch:
+                return
+            manifest.record(ingester.flush(batch))
+            done_decks += len(batch)
+            done_slides += batch_slides
+            elapsed = time.perf_counter() - started
+            print(
+                f"{done_decks}/{len(todo)} decks, {done_slides} slides, {elapsed:.1f}s "
+                f"({done_decks / elapsed:.2f} decks/s, {done_slides / elapsed:.1f} slides/s)",
+                flush=True,
+            )
+            batch, batch_slides = [], 0
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            in_flight = set()
+            while True:
+                # keep the pool busy without holding every parsed deck in memory
+                while len(in_flight) < args.workers * 2:
+                    nxt = next(queue, None)
+                    if nxt is None:
+                        break
+                    in_flight.add(pool.submit(_extract, nxt[0]))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    deck = fut.result()
+                    if "error" in deck:
+                        failed += 1
+                        print(f"failed: {deck['path']}: {deck['error']}", file=sys.stderr)
+                        continue
+                    deck["rel"] = os.path.relpath(deck["path"], root)
+                    deck["stamp"] = Manifest.stamp(deck["path"])
+                    deck["course_id"] = ingester.course_for(course_of[deck["path"]])
+                    batch.append(deck)
+                    batch_slides += len(deck["slides"])
+                if batch_slides >= args.batch_slides:
+                    flush()
+            flush()
+        if failed:
+            print(f"{failed} deck(s) failed and will be retried on the next run", file=sys.stderr)
+        return 1 if failed else 0
+    finally:
+        db.close()
+        manifest.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="folder of .pptx files, one sub-folder per course")
+    parser.add_argument("--owner", required=True, help="email of the user who will own the summaries")
+    parser.add_argument("--course-id", type=int, help="put every deck into this existing course")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--batch-size", type=int, default=8, help="slides per summarizer call")
+    parser.add_argument("--batch-slides", type=int, default=64, help="slides per database transaction")
+    parser.add_argument("--manifest", help=f"defaults to ROOT/{MANIFEST_NAME}")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
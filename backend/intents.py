@@ -0,0 +1,141 @@
+"""Rule-based intent routing for chat messages.
+
+Structural questions about the deck ("how many slides", "list slide titles",
+"bullets of slide 4") are answered straight from session data; only real
+questions reach explain_slide or answer_question. Every decision is counted
+in chat_intents_total{intent,route} so the share of model-free answers shows
+up on /metrics.
+"""
+
+import re
+from dataclasses import dataclass
+
+from .metrics import counter
+
+
+ASSIGNMENT = "assignment"
+QUIZ = "quiz"
+SLIDE_COUNT = "slide_count"
+SLIDE_TITLES = "slide_titles"
+SLIDE_TITLE = "slide_title"
+SLIDE_BULLETS = "slide_bullets"
+SLIDE_TEXT = "slide_text"
+EXPLAIN_SLIDE = "explain_slide"
+QUESTION = "question"
+
+INTENTS = counter(
+    "chat_intents_total",
+    "Chat messages by routed intent; route is rule (no model call) or model.",
+    ("intent", "route"),
+)
+
+SLIDE_RX = re.compile(r"(?:slide|page)\s*(?:no\.?|number|#)?\s*[:.-]?\s*(\d{1,3})", re.I)
+_SLIDE_FALLBACK_RX = re.compile(r"(?:slide|page).*?(\d{1,3})", re.I)
+
+# Structural rules match the whole (normalized) message, so any extra content
+# word ("how many slides talk about recursion") falls through to the model.
+# Page-specific messages are matched with the slide reference replaced by "slide #".
+_DECK = r"(?: (?:in|of) (?:this|the) (?:deck|lecture|presentation))?"
+_COUNT_RX = re.compile(
+    r"^(?:how many (?:slides|pages)(?: are there| does (?:this|the) (?:deck|lecture|presentation) have)?" + _DECK
+    + r"|(?:what is )?the (?:number|count) of (?:slides|pages)" + _DECK
+    + r"|(?:number|count) of (?:slides|pages)|(?:slide|page) count)$"
+)
+_TITLES_RX = re.compile(
+    r"^(?:(?:list|show)(?: me)?(?: all)?(?: the)? (?:slide |page )?titles" + _DECK
+    + r"|(?:what are )?(?:the |all )?(?:slide|page) titles" + _DECK
+    + r"|(?:list|show)(?: me)?(?: all)?(?: the)? (?:slides|pages)|table of contents)$"
+)
+_BULLETS_RX = re.compile(
+    r"^(?:(?:show|list|give)(?: me)? |what are )?(?:the )?(?:bullets?|bullet points|key points|summary) (?:of|for|on|from) slide #$"
+    r"|^summari[sz]e slide #$|^slide # (?:bullets|bullet points|key points|summary)$"
+)
+_TITLE_RX = re.compile(
+    r"^(?:what is )?(?:the )?title of slide #$|^what is slide # (?:called|titled)$|^slide # title$"
+)
+_TEXT_RX = re.compile(
+    r"^(?:(?:show|give)(?: me)? |what is )?(?:the )?(?:raw |full |original )?(?:text|content) (?:of|on|from) slide #$"
+)
+_POLITE_RX = re.compile(r"^(?:please|can you|could you)\s+|\s+please$")
+
+
+def _normalize(message: str) -> str:
+    text = re.sub(r"\s+", " ", (message or "").strip().lower()).rstrip("?.! ")
+    text = text.replace("what's", "what is")
+    return _POLITE_RX.sub("", text)
+
+
+@dataclass
+class Route:
+    intent: str
+    page: int | None = None
+    answer: str | None = None  # set when the message was answered without a model
+
+
+def extract_slide_number(message: str) -> int | None:
+    if not message:
+        return None
+    txt = message.lower()
+    m = SLIDE_RX.search(txt) or _SLIDE_FALLBACK_RX.search(txt)
+    if m:
+        n = int(m.group(1))
+        return n if 1 <= n <= 999 else None
+    return None
+
+
+def classify(message: str) -> tuple[str, int | None]:
+    text = _normalize(message)
+    if text.startswith("generate assignment"):
+        return ASSIGNMENT, None
+    if text.startswith("generate quiz"):
+        return QUIZ, None
+    page = extract_slide_number(text)
+    if page is None:
+        if _COUNT_RX.match(text):
+            return SLIDE_COUNT, None
+        if _TITLES_RX.match(text):
+            return SLIDE_TITLES, None
+        return QUESTION, None
+    shape = SLIDE_RX.sub("slide #", text, count=1)
+    if _TEXT_RX.match(shape):
+        return SLIDE_TEXT, page
+    if _BULLETS_RX.match(shape):
+        return SLIDE_BULLETS, page
+    if _TITLE_RX.match(shape):
+        return SLIDE_TITLE, page
+    return EXPLAIN_SLIDE, page
+
+
+def _structural_answer(intent: str, page: int | None, slides: list[dict]) -> str | None:
+    if intent == SLIDE_COUNT:
+        return f"📊 This deck has {len(slides)} slides."
+    if intent == SLIDE_TITLES:
+        if not slides:
+            return "⚠️ This deck has no slides."
+        return "🗂️ **Slide titles**\n" + "\n".join(
+            f"{s['page']}. {s.get('title') or '(untitled)'}" for s in slides
+        )
+    if intent not in (SLIDE_TITLE, SLIDE_BULLETS, SLIDE_TEXT):
+        return None
+    hit = next((s for s in slides if s.get("page") == page), None)
+    if hit is None:
+        return f"⚠️ Slide {page} not found. This deck has {len(slides)} slides."
+    title = hit.get("title") or "(untitled)"
+    if intent == SLIDE_TITLE:
+        return f"📑 Slide {page} is titled **{title}**."
+    if intent == SLIDE_TEXT:
+        text = (hit.get("text") or "").strip()
+        return f"📑 **Slide {page}: {title}**\n\n{text or '(This slide has no text.)'}"
+    if not hit.get("bullets"):
+        return None  # not summarized yet; let the model explain it
+    return f"🧾 **Slide {page}: {title}**\n" + "\n".join(f"• {b}" for b in hit["bullets"])
+
+
+def route(message: str, slides: list[dict]) -> Route:
+    """Classify a chat message and answer it from the slides when no model is needed."""
+    intent, page = classify(message)
+    answer = _structural_answer(intent, page, slides)
+    if answer is None and intent in (SLIDE_TITLE, SLIDE_BULLETS, SLIDE_TEXT):
+        intent = EXPLAIN_SLIDE
+    INTENTS.inc(intent=intent, route="rule" if answer is not None else "model")
+    return Route(intent, page, answer)
@@ -0,0 +1,155 @@
+"""Schema and data migrations for existing databases.
+
+    python -m backend.migrations          # apply pending migrations
+    python -m backend.migrations --list   # show applied / pending
+
+Applied migrations are recorded in schema_migrations, so startup only runs the
+ones a database has not seen; each runs in its own transaction. A Postgres
+advisory lock makes concurrent workers wait for the first one instead of
+repeating its work.
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import text
+
+from .blobs import migrate_slide_text
+from .search import backfill_search_vectors
+from .slides import migrate_summary_snapshots
+
+
+logger = logging.getLogger("ai_lecture_app")
+
+MIGRATION_LOCK_ID = 724_310_001
+
+# create_all() only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Migrations are (name, statement) pairs and
+# names must never change; statements should still be idempotent, since a
+# database migrated before schema_migrations existed replays them once.
+# Statements may also be callables taking the connection, for data migrations.
+MIGRATIONS = [
+    ("summaries_slide_count", "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS slide_count INTEGER"),
+    ("summaries_slide_count_backfill", """
+    UPDATE summaries SET slide_count = jsonb_array_length(slides_payload)
+    WHERE slide_count IS NULL AND jsonb_typeof(slides_payload) = 'array'
+    """),
+    ("ix_summaries_user_course_created",
+     "CREATE INDEX IF NOT EXISTS ix_summaries_user_course_created ON summaries (user_id, course_id, created_at, id)"),
+    ("ix_summaries_user_created",
+     "CREATE INDEX IF NOT EXISTS ix_summaries_user_created ON summaries (user_id, created_at, id)"),
+    ("ix_assignments_course_created",
+     "CREATE INDEX IF NOT EXISTS ix_assignments_course_created ON assignments (course_id, created_at, id)"),
+    ("ix_quizzes_course_created",
+     "CREATE INDEX IF NOT EXISTS ix_quizzes_course_created ON quizzes (course_id, created_at, id)"),
+    # Copy legacy per-session JSON payloads into the slides table. content_hash
+    # must match backend.slides.content_hash; token_count stays NULL for these rows.
+    ("slides_from_session_payloads", """
+    INSERT INTO slides (session_id, page, title, text, bullets, content_hash)
+    SELECT ls.id,
+           (el->>'page')::int,
+           el->>'title',
+           coalesce(el->>'text', ''),
+           coalesce(el->'bullets', '[]'::jsonb),
+           encode(sha256(convert_to(coalesce(el->>'title', '') || E'\\n' || coalesce(el->>'text', ''), 'UTF8')), 'hex')
+    FROM lecture_sessions ls, jsonb_array_elements(ls.slides_payload) el
+    WHERE jsonb_typeof(ls.slides_payload) = 'array' AND (el->>'page') IS NOT NULL
+    ON CONFLICT (session_id, page) DO NOTHING
+    """),
+    ("summaries_search_vector", "ALTER TABLE summaries ADD COLUMN IF NOT EXISTS search_vector tsvector"),
+    ("summaries_search_vector_backfill", backfill_search_vectors),
+    ("ix_summaries_search", "CREATE INDEX IF NOT EXISTS ix_summaries_search ON summaries USING gin (search_vector)"),
+    ("lecture_sessions_digest", "ALTER TABLE lecture_sessions ADD COLUMN IF NOT EXISTS digest JSONB"),
+    # Compact storage: slide text once per content hash in slide_blobs, and no
+    # copies on sessions whose slides rows exist. Summaries keep their own
+    # snapshot (bullets inline, text by hash) because they are immutable.
+    ("slides_text_nullable", "ALTER TABLE slides ALTER COLUMN text DROP NOT NULL"),
+    ("slides_text_no_default", "ALTER TABLE slides ALTER COLUMN text DROP DEFAULT"),
+    ("lecture_sessions_pptx_text_nullable", "ALTER TABLE lecture_sessions ALTER COLUMN pptx_text DROP NOT NULL"),
+    ("slides_duplicate_of", "ALTER TABLE slides ADD COLUMN IF NOT EXISTS duplicate_of INTEGER"),
+    ("assignments_user_id",
+     "ALTER TABLE assignments ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL"),
+    ("assignments_session_id",
+     "ALTER TABLE assignments ADD COLUMN IF NOT EXISTS session_id VARCHAR(64) REFERENCES lecture_sessions(id) ON DELETE SET NULL"),
+    ("assignments_source_hash", "ALTER TABLE assignments ADD COLUMN IF NOT EXISTS source_hash VARCHAR(64)"),
+    ("ix_assignments_session_source",
+     "CREATE INDEX IF NOT EXISTS ix_assignments_session_source ON assignments (session_id, source_hash)"),
+    ("quizzes_user_id",
+     "ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL"),
+    ("quizzes_session_id",
+     "ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS session_id VARCHAR(64) REFERENCES lecture_sessions(id) ON DELETE SET NULL"),
+    ("quizzes_source_hash", "ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS source_hash VARCHAR(64)"),
+    ("ix_quizzes_session_source",
+     "CREATE INDEX IF NOT EXISTS ix_quizzes_session_source ON quizzes (session_id, source_hash)"),
+    ("slide_text_to_blobs", migrate_slide_text),
+    ("summary_snapshots", migrate_summary_snapshots),
+    ("lecture_sessions_drop_copies", """
+    UPDATE lecture_sessions ls SET slides_payload = NULL, pptx_text = NULL, summary_text = NULL
+    WHERE (ls.slides_payload IS NOT NULL OR ls.pptx_text IS NOT NULL OR ls.summary_text IS NOT NULL)
+      AND EXISTS (SELECT 1 FROM slides sl WHERE sl.session_id = ls.id)
+    """),
+]
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name VARCHAR(128) PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+def applied_migrations(conn) -> set[str]:
+    return set(conn.execute(text("SELECT name FROM schema_migrations")).scalars())
+
+
+def run_migrations(engine) -> list[str]:
+    """Apply pending migrations in order; returns the names that ran."""
+    ran = []
+    with engine.connect() as conn:
+        conn.execute(text(CREATE_MIGRATIONS_TABLE))
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        conn.commit()
+        try:
+            done = applied_migrations(conn)
+            conn.commit()
+            for name, statement in MIGRATIONS:
+                if name in done:
+                    continue
+                with conn.begin():
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(text(statement))
+                    conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+                ran.append(name)
+                logger.info("Applied migration %s", name)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            conn.commit()
+    return ran
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply pending schema and data migrations.")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from .database import Base, engine
+
+    if args.list:
+        with engine.connect() as conn:
+            conn.execute(text(CREATE_MIGRATIONS_TABLE))
+            done = applied_migrations(conn)
+            conn.commit()
+        for name, _ in MIGRATIONS:
+            print(f"{'applied' if name in done else 'pending':<8} {name}")
+        return 0
+    Base.metadata.create_all(bind=engine)
+    ran = run_migrations(engine)
+    print(f"applied {len(ran)} migration(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,430 @@
+"""Shared model server: one process owns the models, API workers call it over a Unix socket.
+
+    MODEL_SERVER_SOCKET=/run/ai-lecture/models.sock python -m backend.model_server
+    MODEL_BACKEND=server MODEL_SERVER_SOCKET=/run/ai-lecture/models.sock uvicorn backend.app:app --workers 8
+
+With MODEL_BACKEND=server, `summarize` and `qa_model` swap their pipelines for
+the proxies below, so every uvicorn worker shares the server's single copy of
+the models. The server groups concurrent inputs with the same op and
+generation arguments into one batched pipeline call; max_length/min_length are
+bucketed rather than matched exactly, and each batch runs with the tightest
+limits of its members (as summarize_slides does).
+
+Frames are a fixed binary header (version, op or status, request id, payload
+length) followed by a binary payload of tagged values (see _pack). A request
+carries a list of inputs and the generation kwargs; the response carries one
+output per input: token counts for OP_TOKENIZE, generated text otherwise.
+Requests on one connection may be pipelined; responses carry the request id
+they answer.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET", "/tmp/ai-lecture-models.sock")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT") or 300)
+MODEL_SERVER_MAX_BATCH = int(os.getenv("MODEL_SERVER_MAX_BATCH") or 8)
+MODEL_SERVER_BATCH_WAIT_MS = float(os.getenv("MODEL_SERVER_BATCH_WAIT_MS") or 5)
+# Inputs whose max_length falls in the same bucket of this many tokens batch together.
+MODEL_SERVER_LENGTH_BUCKET = int(os.getenv("MODEL_SERVER_LENGTH_BUCKET") or 32)
+# Backend the server itself loads; MODEL_BACKEND=server is meant for the API workers.
+MODEL_SERVER_BACKEND = os.getenv("MODEL_SERVER_BACKEND", "hf")
+
+PROTOCOL_VERSION = 2
+OP_TOKENIZE = 1
+OP_SUMMARIZE = 2
+OP_TEXT2TEXT = 3
+STATUS_OK = 0
+STATUS_ERROR = 1
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# version, op (requests) or status (responses), request id, payload length
+_HEADER = struct.Struct("!BBII")
+_U32 = struct.Struct("!I")
+_I64 = struct.Struct("!q")
+_F64 = struct.Struct("!d")
+_T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_LIST, _T_DICT = range(8)
+
+# pipeline output key per op; only the text itself crosses the socket
+_OUTPUT_KEYS = {OP_SUMMARIZE: "summary_text", OP_TEXT2TEXT: "generated_text"}
+_LENGTH_KWARGS = ("max_length", "min_length")
+
+logger = logging.getLogger("ai_lecture_app")
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+def _pack(value, out: bytearray):
+    if value is None:
+        out.append(_T_NONE)
+    elif value is True or value is False:
+        out.append(_T_TRUE if value else _T_FALSE)
+    elif isinstance(value, int):
+        out.append(_T_INT)
+        out += _I64.pack(value)
+    elif isinstance(value, float):
+        out.append(_T_FLOAT)
+        out += _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_T_STR)
+        out += _U32.pack(len(data))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        out.append(_T_LIST)
+        out += _U32.pack(len(value))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        out.append(_T_DICT)
+        out += _U32.pack(len(value))
+        for key, item in value.items():
+            _pack(str(key), out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"cannot send {type(value).__name__} to the model server")
+
+
+def _unpack(buf: memoryview, pos: int = 0):
+    """Decode one value starting at `pos`; returns (value, next position)."""
+    try:
+        tag = buf[pos]
+        pos += 1
+        if tag == _T_NONE:
+            return None, pos
+        if tag in (_T_FALSE, _T_TRUE):
+            return tag == _T_TRUE, pos
+        if tag == _T_INT:
+            return _I64.unpack_from(buf, pos)[0], pos + _I64.size
+        if tag == _T_FLOAT:
+            return _F64.unpack_from(buf, pos)[0], pos + _F64.size
+        (n,) = _U32.unpack_from(buf, pos)
+        pos += _U32.size
+        if tag == _T_STR:
+            if pos + n > len(buf):
+                raise ModelServerError("truncated frame")
+            return str(buf[pos:pos + n], "utf-8"), pos + n
+        if tag == _T_LIST:
+            items = []
+            for _ in range(n):
+                item, pos = _unpack(buf, pos)
+                items.append(item)
+            return items, pos
+        if tag == _T_DICT:
+            mapping = {}
+            for _ in range(n):
+                key, pos = _unpack(buf, pos)
+                mapping[key], pos = _unpack(buf, pos)
+            return mapping, pos
+    except (IndexError, struct.error, UnicodeDecodeError) as exc:
+        raise ModelServerError(f"malformed frame: {exc}") from None
+    raise ModelServerError(f"unknown value tag {tag}")
+
+
+def _encode(kind: int, request_id: int, payload) -> bytes:
+    body = bytearray()
+    _pack(payload, body)
+    return _HEADER.pack(PROTOCOL_VERSION, kind, request_id, len(body)) + bytes(body)
+
+
+def _decode(body: bytes):
+    value, end = _unpack(memoryview(body))
+    if end != len(body):
+        raise ModelServerError("trailing bytes in frame")
+    return value
+
+
+def _parse_header(header: bytes) -> tuple[int, int, int]:
+    version, kind, request_id, length = _HEADER.unpack(header)
+    if version != PROTOCOL_VERSION:
+        raise ModelServerError(f"unsupported protocol version {version}")
+    if length > MAX_FRAME_BYTES:
+        raise ModelServerError(f"frame of {length} bytes exceeds limit")
+    return kind, request_id, length
+
+
+# --- client (API workers) -------------------------------------------------
+
+class ModelServerClient:
+    """Blocking client with one connection per calling thread.
+
+    Calls come from inference scheduler and threadpool threads, so each thread
+    keeps its own socket and waits for its own response.
+    """
+
+    def __init__(self, path: str = MODEL_SERVER_SOCKET, timeout: float = MODEL_SERVER_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+
+    def _connect(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _recv_exactly(self, sock: socket.socket, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionResetError("model server closed the connection")
+            buf += chunk
+        return bytes(buf)
+
+    def call(self, op: int, items: list, kwargs: dict | None = None) -> list:
+        """Run `op` over all `items` in one request; returns one output per item."""
+        request_id = next(self._ids) & 0xFFFFFFFF
+        frame = _encode(op, request_id, [list(items), kwargs or {}])
+        # One retry on a dropped connection (e.g. the model server restarted).
+        for attempt in range(2):
+            sock = self._connect()
+            try:
+                sock.sendall(frame)
+                status, got_id, length = _parse_header(self._recv_exactly(sock, _HEADER.size))
+                payload = _decode(self._recv_exactly(sock, length))
+                break
+            except (ConnectionError, BrokenPipeError):
+                self._disconnect()
+                if attempt:
+                    raise
+            except BaseException:
+                # timeouts or bad frames leave the stream out of step
+                self._disconnect()
+                raise
+        if got_id != request_id:
+            self._disconnect()
+            raise ModelServerError("response does not match request")
+        if status != STATUS_OK:
+            raise ModelServerError(payload)
+        return payload
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ModelServerClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ModelServerClient()
+        return _client
+
+
+class RemoteTokenizer:
+    """Tokenizer proxy; only token counts cross the socket."""
+
+    def __call__(self, text, add_special_tokens=False, return_attention_mask=False, **kwargs):
+        if isinstance(text, list):
+            counts = get_client().call(OP_TOKENIZE, [t or "" for t in text])
+            return {"input_ids": [range(n) for n in counts]}
+        return {"input_ids": range(get_client().call(OP_TOKENIZE, [text or ""])[0])}
+
+
+class RemotePipeline:
+    """Pipeline proxy returning the same shapes as the local pipeline.
+
+    A list input is sent as one request, so the server can batch it whole.
+    """
+
+    def __init__(self, op: int):
+        self.op = op
+        self.key = _OUTPUT_KEYS[op]
+
+    def __call__(self, inputs, **kwargs):
+        if isinstance(inputs, list):
+            return [{self.key: out} for out in get_client().call(self.op, inputs, kwargs)]
+        return [{self.key: get_client().call(self.op, [inputs], kwargs)[0]}]
+
+
+# --- server ---------------------------------------------------------------
+
+def _load_models():
+    # The server must load real models even when it shares the workers' env.
+    if os.environ.get("MODEL_BACKEND") == "server":
+        os.environ["MODEL_BACKEND"] = MODEL_SERVER_BACKEND
+    from .resources import TORCH_THREADS, apply_resource_limits, available_cpus
+    # a single model thread, so it gets every core unless told otherwise
+    apply_resource_limits(threads=TORCH_THREADS or len(available_cpus()), affinity="")
+    from . import qa_model, summarize
+
+    def run_batch(op: int, inputs: list, kwargs: dict) -> list:
+        if op == OP_TOKENIZE:
+            enc = summarize.tokenizer(inputs, add_special_tokens=False, return_attention_mask=False)
+            return [len(ids) for ids in enc["input_ids"]]
+        if op == OP_SUMMARIZE:
+            outputs = summarize.summarizer(inputs, **kwargs)
+        elif op == OP_TEXT2TEXT:
+            outputs = qa_model.qa_model(inputs, **kwargs)
+        else:
+            raise ModelServerError(f"unknown op {op}")
+        return [out[_OUTPUT_KEYS[op]] for out in outputs]
+
+    return run_batch
+
+
+def _batch_key(op: int, kwargs: dict) -> tuple:
+    """Inputs with equal keys share a pipeline call; max_length is bucketed, not exact."""
+    rest = {k: v for k, v in kwargs.items() if k not in _LENGTH_KWARGS}
+    max_length = kwargs.get("max_length")
+    bucket = max_length // MODEL_SERVER_LENGTH_BUCKET if isinstance(max_length, int) else max_length
+    return op, json.dumps(rest, sort_keys=True), bucket
+
+
+def _merged_kwargs(batch: list) -> dict:
+    """One call's kwargs: the shared ones plus the tightest length limits in the batch."""
+    kwargs = {k: v for k, v in batch[0][1].items() if k not in _LENGTH_KWARGS}
+    max_lengths = [kw["max_length"] for _, kw, _ in batch if "max_length" in kw]
+    min_lengths = [kw["min_length"] for _, kw, _ in batch if "min_length" in kw]
+    if max_lengths:
+        kwargs["max_length"] = min(max_lengths)
+    if min_lengths:
+        kwargs["min_length"] = min(min_lengths)
+        if max_lengths:
+            kwargs["min_length"] = min(kwargs["min_length"], max(1, kwargs["max_length"] - 1))
+    return kwargs
+
+
+class _Batcher:
+    """Collects inputs with the same op and (bucketed) kwargs into one pipeline call."""
+
+    def __init__(self, run_batch, max_batch: int, wait_ms: float):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.wait = max(wait_ms, 0.0) / 1000.0
+        # one thread owns the models; torch parallelises inside each call
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-server")
+        self._pending: dict[tuple, list] = {}
+        self._timers: dict[tuple, asyncio.TimerHandle] = {}
+
+    async def submit(self, op: int, items: list, kwargs: dict) -> list:
+        loop = asyncio.get_running_loop()
+        key = _batch_key(op, kwargs)
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            futures.append(future)
+            batch = self._pending.setdefault(key, [])
+            batch.append((item, kwargs, future))
+            if len(batch) >= self.max_batch:
+                self._flush(key)
+            elif len(batch) == 1:
+                self._timers[key] = loop.call_later(self.wait, self._flush, key)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self, key: tuple):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            asyncio.ensure_future(self._run(key[0], batch))
+
+    async def _run(self, op: int, batch: list):
+        loop = asyncio.get_running_loop()
+        try:
+            outputs = await loop.run_in_executor(
+                self.executor, self.run_batch, op, [item for item, _, _ in batch], _merged_kwargs(batch)
+            )
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), out in zip(batch, outputs):
+            if not future.done():
+                future.set_result(out)
+
+
+class ModelServer:
+    def __init__(self, path: str, batcher: _Batcher):
+        self.path = path
+        self.batcher = batcher
+
+    async def _respond(self, writer, write_lock, op: int, request_id: int, payload: dict):
+        try:
+            items, kwargs = payload
+            if not isinstance(items, list) or not isinstance(kwargs, dict):
+                raise ModelServerError("expected [inputs, kwargs]")
+            result = await self.batcher.submit(op, items, kwargs or {})
+            frame = _encode(STATUS_OK, request_id, result)
+        except Exception as exc:
+            logger.exception("model server request failed")
+            frame = _encode(STATUS_ERROR, request_id, f"{type(exc).__name__}: {exc}")
+        async with write_lock:
+            writer.write(frame)
+            await writer.drain()
+
+    async def _handle(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                op, request_id, length = _parse_header(await reader.readexactly(_HEADER.size))
+                payload = _decode(await reader.readexactly(length))
+                task = asyncio.create_task(self._respond(writer, write_lock, op, request_id, payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ModelServerError, ValueError) as exc:
+            logger.warning("model server dropped a connection: %s", exc)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        logger.info("model server listening on %s", self.path)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the summarizer and QA models over a Unix socket.")
+    parser.add_argument("--socket", default=MODEL_SERVER_SOCKET)
+    parser.add_argument("--max-batch", type=int, default=MODEL_SERVER_MAX_BATCH)
+    parser.add_argument("--batch-wait-ms", type=float, default=MODEL_SERVER_BATCH_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    batcher = _Batcher(_load_models(), args.max_batch, args.batch_wait_ms)
+    try:
+        asyncio.run(ModelServer(args.socket, batcher).serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,12 +4,15 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
+    SmallInteger,
     String,
     Text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -52,38 +55,100 @@ class Summary(Base):
     title = Column(String(255), nullable=True)
     summary_text = Column(Text, nullable=False)
     slides_payload = Column(JSONB, nullable=True)
+    slide_count = Column(Integer, nullable=True)
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="summaries")
     course = relationship("Course", back_populates="summaries")
 
+    __table_args__ = (
+        Index("ix_summaries_user_course_created", "user_id", "course_id", "created_at", "id"),
+        Index("ix_summaries_user_created", "user_id", "created_at", "id"),
+        Index("ix_summaries_search", "search_vector", postgresql_using="gin"),
+    )
+
 class LectureSession(Base):
     __tablename__ = "lecture_sessions"
 
     id = Column(String(64), primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    pptx_text = Column(Text, nullable=False)
+    # pptx_text/summary_text/slides_payload are only set on sessions that predate
+    # the slides table; newer ones derive them from slides + slide_blobs.
+    pptx_text = Column(Text, nullable=True)
     summary_text = Column(Text, nullable=True)
     slides_payload = Column(JSONB, nullable=True)
+    # {"fingerprint", "text", "cache"} maintained by backend.digest
+    digest = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="lecture_sessions")
+    slides = relationship(
+        "Slide",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Slide.page",
+    )
+
+
+class Slide(Base):
+    __tablename__ = "slides"
+
+    session_id = Column(String(64), ForeignKey("lecture_sessions.id", ondelete="CASCADE"), primary_key=True)
+    page = Column(Integer, primary_key=True)
+    title = Column(Text, nullable=True)
+    # NULL once the text lives in slide_blobs under content_hash
+    text = Column(Text, nullable=True)
+    bullets = Column(JSONB, nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    token_count = Column(Integer, nullable=True)
+    # page of an earlier near-duplicate whose bullets this slide reuses
+    duplicate_of = Column(Integer, nullable=True)
+
+    session = relationship("LectureSession", back_populates="slides")
+
+
+class SlideBlob(Base):
+    __tablename__ = "slide_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    codec = Column(SmallInteger, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer, nullable=False)
 
 class Assignment(Base):
     __tablename__ = "assignments"
 
     id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    session_id = Column(String(64), ForeignKey("lecture_sessions.id", ondelete="SET NULL"), nullable=True)
+    # sha256 of the lecture text it was generated from; reused while unchanged
+    source_hash = Column(String(64), nullable=True)
     title = Column(String)
     content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_assignments_course_created", "course_id", "created_at", "id"),
+        Index("ix_assignments_session_source", "session_id", "source_hash"),
+    )
+
 
 class Quiz(Base):
     __tablename__ = "quizzes"
 
     id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    session_id = Column(String(64), ForeignKey("lecture_sessions.id", ondelete="SET NULL"), nullable=True)
+    source_hash = Column(String(64), nullable=True)
     title = Column(String)
     content = Column(Text)   # store as text or JSON
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_quizzes_course_created", "course_id", "created_at", "id"),
+        Index("ix_quizzes_session_source", "session_id", "source_hash"),
+    )
@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime | None, row_id: int) -> str:
+    raw = json.dumps(
+        {"c": created_at.isoformat() if created_at is not None else None, "i": row_id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(data["c"]) if data["c"] is not None else None
+        return created_at, int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def keyset_page(query, model, cursor: str | None, limit: int):
+    """Return one page of `query` ordered newest-first on (created_at, id), plus the next cursor.
+
+    Legacy rows without created_at come first, newest id first; that is
+    Postgres's own DESC order, so the (created_at, id) indexes still serve it.
+    """
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(or_(
+                and_(model.created_at.is_(None), model.id < last_id),
+                model.created_at.is_not(None),
+            ))
+        else:
+            query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, last_id))
+    rows = query.order_by(model.created_at.desc().nulls_first(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,98 @@
+"""Opt-in sampling profiler producing folded stacks (flamegraph.pl / speedscope input)."""
+
+import hmac
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS") or 5)
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "ai-lecture-profiles")
+
+PROFILE_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def profiling_allowed(token: str | None) -> bool:
+    """Profiling is admin-only: it is off unless PROFILING_TOKEN is set and matched."""
+    return bool(PROFILING_TOKEN) and bool(token) and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class SamplingProfiler:
+    """Samples Python stacks from a background thread and aggregates them as folded stacks.
+
+    The thread that starts the profiler (the event loop for async endpoints) is
+    always sampled. Other threads are included only while they are executing code
+    from this package, which picks up threadpool work such as model calls and
+    sync endpoints; concurrent requests doing the same work can appear too.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = max(interval_ms, 0.5) / 1000.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._main_ident = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+        self.duration = 0.0
+
+    def start(self):
+        self._main_ident = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            names.update((t.ident, t.name) for t in threading.enumerate())
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                in_backend = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(_BACKEND_DIR):
+                        in_backend = True
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if ident != self._main_ident and not in_backend:
+                    continue
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def save_profile(profile_id: str, profiler: SamplingProfiler) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(profiler.folded())
+    return path
+
+
+def load_profile(profile_id: str) -> str | None:
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
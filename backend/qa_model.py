@@ -1,11 +1,26 @@
-from transformers import pipeline
-qa_model = pipeline("text2text-generation", model="google/flan-t5-base")
 from openai import OpenAI
 import os
 
+from .metrics import STAGE_SECONDS
+
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "hf")
+QA_MODEL = os.getenv("QA_MODEL", "google/flan-t5-base")
+if MODEL_BACKEND == "stub":
+    from .stub_models import StubText2Text
+    qa_model = StubText2Text()
+elif MODEL_BACKEND == "server":
+    from .model_server import OP_TEXT2TEXT, RemotePipeline
+    qa_model = RemotePipeline(OP_TEXT2TEXT)
+else:
+    from .resources import apply_resource_limits
+    apply_resource_limits()
+    from transformers import pipeline
+    qa_model = pipeline("text2text-generation", model=QA_MODEL)
+
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
+@STAGE_SECONDS.time(stage="answer_question")
 def answer_question(context: str, question: str) -> str:
     
     prompt = (
@@ -20,6 +35,7 @@ def answer_question(context: str, question: str) -> str:
     return result[0]["generated_text"].strip()
 
 
+@STAGE_SECONDS.time(stage="explain_slide")
 def explain_slide(context: str, prompt: str) -> str:
     """Generate a longer, didactic explanation for a single slide."""
     full_prompt = (
@@ -40,6 +56,7 @@ def explain_slide(context: str, prompt: str) -> str:
     return result[0]["generated_text"].strip()
 
 
+@STAGE_SECONDS.time(stage="generate_assignment")
 def generate_assignment_from_lecture(lecture_text: str) -> str:
     prompt = f"""
 You are a university instructor. Based ONLY on the lecture content below, write a ready-to-use assignment for university students.
@@ -84,6 +101,7 @@ IMPORTANT:
 
 
 
+@STAGE_SECONDS.time(stage="generate_quiz")
 def generate_quiz_from_lecture(lecture_text: str) -> str:
     prompt = f"""
 You are a university instructor. Based ONLY on the lecture content below, write a ready-to-use assignment for university students.
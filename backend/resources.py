@@ -0,0 +1,278 @@
+"""CPU budget for local inference: torch thread counts and optional core pinning.
+
+Every concurrent generation runs its own intra-op thread team, so the host is
+oversubscribed unless
+
+    uvicorn workers x INFERENCE_WORKERS x TORCH_THREADS <= cores.
+
+apply_resource_limits() is called by summarize.py and qa_model.py before the
+models load. Thread counts come from TORCH_THREADS / TORCH_INTEROP_THREADS,
+else from the autotuned RESOURCE_CONFIG file, else from an even split of the
+cores. CPU_AFFINITY=auto gives each uvicorn worker process a disjoint CPU set;
+an explicit list such as "0-3,8" pins to exactly those CPUs. The inference
+scheduler's worker count is INFERENCE_WORKERS, else the autotuned
+concurrent_workers divided across WEB_CONCURRENCY processes.
+
+    python -m backend.resources autotune --output resource_config.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+
+
+TORCH_THREADS = int(os.getenv("TORCH_THREADS") or 0)
+TORCH_INTEROP_THREADS = int(os.getenv("TORCH_INTEROP_THREADS") or 1)
+CPU_AFFINITY = os.getenv("CPU_AFFINITY", "")
+RESOURCE_CONFIG = os.getenv("RESOURCE_CONFIG", "resource_config.json")
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or 1)
+BENCH_TIMEOUT_SECONDS = float(os.getenv("BENCH_TIMEOUT_SECONDS") or 900)
+SLOT_DIR = os.path.join(tempfile.gettempdir(), "ai-lecture-cpu-slots")
+
+logger = logging.getLogger("ai_lecture_app")
+
+_applied = None
+_slot_handle = None
+
+BENCH_TEXT = (
+    "A process is an instance of a program in execution with its own address space, "
+    "while threads within a process share memory and open files. The scheduler decides "
+    "which runnable thread gets the CPU next, balancing throughput against latency. "
+    "Context switches save and restore registers and may flush parts of the cache, so "
+    "they are not free. Synchronisation primitives such as mutexes and condition "
+    "variables prevent data races when threads touch shared state. Deadlock needs mutual "
+    "exclusion, hold and wait, no preemption and a circular wait; removing any one of the "
+    "four conditions prevents it. Modern kernels use per-core run queues and work "
+    "stealing to keep every core busy without a global lock."
+)
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(spec: str) -> list[int]:
+    """Parse "0-3,8,10-11" into [0, 1, 2, 3, 8, 10, 11]."""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def load_config(path: str = RESOURCE_CONFIG) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def inference_workers(config: dict | None = None) -> int:
+    """Concurrent model calls per process: INFERENCE_WORKERS, else the autotuned
+    concurrent_workers split across WEB_CONCURRENCY processes, else 2."""
+    if os.getenv("INFERENCE_WORKERS"):
+        return max(1, int(os.environ["INFERENCE_WORKERS"]))
+    tuned = (load_config() if config is None else config).get("concurrent_workers")
+    if tuned:
+        return max(1, int(tuned) // max(1, WEB_CONCURRENCY))
+    return 2
+
+
+INFERENCE_WORKERS = inference_workers()
+
+
+def _claim_slot(slots: int) -> int | None:
+    """Take the first free worker slot; the lock is held until the process exits.
+
+    Needs flock, so on platforms without fcntl (Windows) no slot is claimed."""
+    global _slot_handle
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    os.makedirs(SLOT_DIR, exist_ok=True)
+    for i in range(slots):
+        fh = open(os.path.join(SLOT_DIR, f"slot-{i}.lock"), "w")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            continue
+        _slot_handle = fh
+        return i
+    return None
+
+
+def _auto_affinity(cpus: list[int], processes: int) -> list[int]:
+    slot = _claim_slot(processes)
+    if slot is None:
+        return cpus
+    share = max(1, len(cpus) // processes)
+    start = (slot * share) % len(cpus)
+    return cpus[start:start + share] or cpus
+
+
+def apply_resource_limits(threads: int | None = None, interop: int | None = None, affinity: str | None = None) -> dict:
+    """Pin the process and size torch's thread pools; safe to call more than once."""
+    global _applied
+    if _applied is not None:
+        return _applied
+
+    config = load_config()
+    affinity = CPU_AFFINITY if affinity is None else affinity
+    cpus = available_cpus()
+    if affinity and hasattr(os, "sched_setaffinity"):
+        pinned = _auto_affinity(cpus, WEB_CONCURRENCY) if affinity == "auto" else parse_cpu_list(affinity)
+        try:
+            os.sched_setaffinity(0, pinned)
+            cpus = pinned
+        except OSError as exc:
+            logger.warning("could not pin to CPUs %s: %s", pinned, exc)
+
+    if threads is None:
+        threads = TORCH_THREADS or config.get("threads_per_worker") or 0
+    if not threads:
+        # CPUs are per process once pinned, otherwise shared by all workers
+        share = len(cpus) if affinity else len(cpus) // max(1, WEB_CONCURRENCY)
+        threads = max(1, share // max(1, INFERENCE_WORKERS))
+    interop = interop or TORCH_INTEROP_THREADS
+
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            # only allowed before the first inter-op parallel region
+            interop = torch.get_num_interop_threads()
+    _applied = {"threads": threads, "interop_threads": interop, "cpus": cpus}
+    logger.info("inference resources: %s", _applied)
+    return _applied
+
+
+def _bench_child(threads: int, iterations: int, text: str, barrier, results):
+    apply_resource_limits(threads=threads, interop=1, affinity="")
+    from .summarize import summarize_slide
+
+    summarize_slide(text)  # warm-up, and keeps model loading out of the timing
+    barrier.wait()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        summarize_slide(text)
+    results.put(time.perf_counter() - start)
+
+
+def bench(workers: int, threads: int, iterations: int, text: str) -> float:
+    """Slides per second with `workers` processes generating concurrently at `threads` each."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_bench_child, args=(threads, iterations, text, barrier, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    elapsed = []
+    deadline = time.monotonic() + BENCH_TIMEOUT_SECONDS
+    try:
+        while len(elapsed) < workers:
+            try:
+                elapsed.append(results.get(timeout=1.0))
+            except queue.Empty:
+                crashed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+                if crashed:
+                    raise RuntimeError(f"benchmark process exited with code {crashed[0]}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"benchmark did not finish within {BENCH_TIMEOUT_SECONDS:.0f}s")
+    finally:
+        for p in procs:
+            if p.is_alive() and len(elapsed) < workers:
+                p.terminate()
+            p.join()
+    return workers * iterations / max(elapsed)
+
+
+def candidates(cores: int, max_workers: int) -> list[tuple[int, int]]:
+    combos = []
+    w = 1
+    while w <= min(cores, max_workers):
+        t = 1
+        while w * t <= cores:
+            combos.append((w, t))
+            t *= 2
+        w *= 2
+    return combos
+
+
+def autotune(output: str, iterations: int, max_workers: int, text: str) -> dict:
+    cores = len(available_cpus())
+    runs = []
+    for workers, threads in candidates(cores, max_workers):
+        try:
+            rate = bench(workers, threads, iterations, text)
+        except RuntimeError as exc:
+            print(f"workers={workers:<3} threads={threads:<3} failed: {exc}")
+            continue
+        runs.append({"workers": workers, "threads_per_worker": threads, "slides_per_second": round(rate, 3)})
+        print(f"workers={workers:<3} threads={threads:<3} {rate:8.3f} slides/s")
+    if not runs:
+        raise RuntimeError("every benchmark run failed; see the errors above")
+    best = max(runs, key=lambda r: r["slides_per_second"])
+    config = {
+        "cores": cores,
+        "threads_per_worker": best["threads_per_worker"],
+        "concurrent_workers": best["workers"],
+        "slides_per_second": best["slides_per_second"],
+        "runs": runs,
+    }
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(config, fh, indent=2)
+    print(
+        f"\nbest: {best['workers']} concurrent generations x {best['threads_per_worker']} threads; "
+        f"the scheduler splits them across WEB_CONCURRENCY processes unless INFERENCE_WORKERS is set. Wrote {output}"
+    )
+    return config
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inference CPU resource tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    tune = sub.add_parser("autotune", help="benchmark summarize_slide and write the best thread layout")
+    tune.add_argument("--output", default=RESOURCE_CONFIG)
+    tune.add_argument("--iterations", type=int, default=5)
+    tune.add_argument("--max-workers", type=int, default=8)
+    tune.add_argument("--text-file", help="slide text to benchmark with (default: built-in sample)")
+    sub.add_parser("show", help="print the limits this process would apply")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        print(json.dumps(apply_resource_limits(), indent=2))
+        return 0
+    text = BENCH_TEXT
+    if args.text_file:
+        with open(args.text_file, encoding="utf-8") as fh:
+            text = fh.read()
+    autotune(args.output, args.iterations, args.max_workers, text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
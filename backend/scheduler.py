@@ -0,0 +1,206 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from fastapi import HTTPException
+
+from .metrics import counter, gauge, histogram
+from .resources import INFERENCE_WORKERS
+
+
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE") or 30)
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST") or 10)
+MAX_QUEUED_PER_USER = int(os.getenv("MAX_QUEUED_PER_USER") or 20)
+# A lower-priority job that has waited this long is served ahead of newer
+# higher-priority work, so bulk summaries cannot be starved indefinitely.
+PRIORITY_AGING_SECONDS = float(os.getenv("PRIORITY_AGING_SECONDS") or 30)
+RATE_LIMIT_MAX_KEYS = 50_000
+
+# Priority classes, highest first.
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BULK, BACKGROUND)
+
+RATE_LIMITED = counter("model_requests_rate_limited_total", "Model requests rejected by admission control.", ("reason",))
+QUEUE_WAIT_SECONDS = histogram("inference_queue_wait_seconds", "Time inference jobs spent queued.", ("priority",))
+RUN_SECONDS = histogram("inference_run_seconds", "Time inference jobs spent running.", ("priority",))
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 on success, otherwise seconds until enough are available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return (cost - self.tokens) / self.refill_per_second
+
+
+class RateLimiter:
+    """Per-key token buckets (a key is a user id, or a client IP for guests)."""
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.per_second = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key: str, cost: float = 1.0):
+        if self.per_second <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.burst, self.per_second)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            wait = bucket.take(cost)
+        if wait:
+            RATE_LIMITED.inc(reason="rate")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down.",
+                headers={"Retry-After": str(max(1, int(wait + 0.999)))},
+            )
+
+
+class _Job:
+    __slots__ = ("priority", "fn", "args", "kwargs", "future", "enqueued")
+
+    def __init__(self, priority, fn, args, kwargs):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class _ClassQueue:
+    """Round-robin queues for one priority class."""
+
+    def __init__(self):
+        self.queues: dict[str, deque] = {}
+        self.ring: deque[str] = deque()
+
+    def oldest_enqueued(self) -> float:
+        return min(q[0].enqueued for q in self.queues.values())
+
+    def pop(self) -> _Job:
+        key = self.ring.popleft()
+        queue = self.queues[key]
+        job = queue.popleft()
+        if queue:
+            self.ring.append(key)
+        else:
+            del self.queues[key]
+        return job
+
+
+class FairScheduler:
+    """Inference executor with priority classes and per-key round-robin within each class.
+
+    Interactive work (chat answers, slide explanations) runs before bulk work
+    (deck summarization), which runs before background work. Bulk jobs are
+    queued one slide at a time, so an interactive request waits for at most the
+    slides already running. Within a class, a user with many queued jobs gets
+    one job per turn, so light users are not stuck behind a heavy user's backlog.
+    """
+
+    def __init__(
+        self,
+        workers: int = INFERENCE_WORKERS,
+        max_queued_per_key: int = MAX_QUEUED_PER_USER,
+        aging_seconds: float = PRIORITY_AGING_SECONDS,
+    ):
+        self.max_queued_per_key = max_queued_per_key
+        self.aging_seconds = aging_seconds
+        self._classes = {p: _ClassQueue() for p in PRIORITIES}
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True) for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, key: str, priority: str, fn, *args, **kwargs) -> Future:
+        job = _Job(priority, fn, args, kwargs)
+        with self._cond:
+            cls = self._classes[priority]
+            queue = cls.queues.get(key)
+            if queue is None:
+                queue = cls.queues[key] = deque()
+                cls.ring.append(key)
+            elif len(queue) >= self.max_queued_per_key:
+                RATE_LIMITED.inc(reason="queue")
+                raise HTTPException(status_code=429, detail="Too many requests queued, please wait.")
+            queue.append(job)
+            self._pending += 1
+            self._cond.notify()
+        return job.future
+
+    async def run(self, key: str, priority: str, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` under `key` in class `priority` and await its result."""
+        return await asyncio.wrap_future(self.submit(key, priority, fn, *args, **kwargs))
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            waiting = [self._classes[p] for p in PRIORITIES if self._classes[p].ring]
+            chosen = waiting[0]
+            if self.aging_seconds > 0:
+                now = time.perf_counter()
+                for cls in reversed(waiting[1:]):
+                    if now - cls.oldest_enqueued() > self.aging_seconds:
+                        chosen = cls
+                        break
+            self._pending -= 1
+            return chosen.pop()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            QUEUE_WAIT_SECONDS.observe(started - job.enqueued, priority=job.priority)
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+            except BaseException as exc:
+                job.future.set_exception(exc)
+            finally:
+                RUN_SECONDS.observe(time.perf_counter() - started, priority=job.priority)
+
+    def queue_depth(self) -> dict:
+        with self._cond:
+            return {p: sum(len(q) for q in cls.queues.values()) for p, cls in self._classes.items()}
+
+    def active_keys(self) -> int:
+        with self._cond:
+            return len({key for cls in self._classes.values() for key in cls.queues})
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+inference = FairScheduler()
+
+gauge("inference_queue_depth", "Inference jobs waiting for a worker.", ("priority",), fn=inference.queue_depth)
+gauge("inference_active_users", "Users with at least one queued inference job.", fn=inference.active_keys)
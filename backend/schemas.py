@@ -68,3 +68,55 @@ class SummaryOut(BaseModel):
     class Config:
         orm_mode = True
 
+
+class SummaryListItem(BaseModel):
+    id: int
+    course_id: int
+    title: Optional[str]
+    source_filename: Optional[str]
+    slide_count: Optional[int]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class SummaryPage(BaseModel):
+    items: list[SummaryListItem]
+    next_cursor: Optional[str] = None
+
+
+class LectureItemListItem(BaseModel):
+    id: int
+    title: Optional[str]
+    created_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
+class LectureItemPage(BaseModel):
+    items: list[LectureItemListItem]
+    next_cursor: Optional[str] = None
+
+
+class LectureItemOut(LectureItemListItem):
+    content: Optional[str]
+
+
+class SummarySearchHit(SummaryListItem):
+    rank: float
+    snippet: str
+
+
+class SummarySearchPage(BaseModel):
+    items: list[SummarySearchHit]
+    next_offset: Optional[int] = None
+
+
+class SessionMeta(BaseModel):
+    session_id: str
+    slide_count: int
+    summarized_slides: int
+    chat_turns: int
+    has_digest: bool
@@ -0,0 +1,126 @@
+import html
+
+from sqlalchemy import bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from .models import Summary
+from .slides import hydrate_snapshot
+
+
+SEARCH_CONFIG = "english"
+# ts_headline copies the summary text verbatim, so matches are delimited with
+# control characters and highlight_snippet() turns them into <mark> tags only
+# after the user-written text has been HTML-escaped.
+_MARK_START, _MARK_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f"MaxFragments=2, MaxWords=25, MinWords=8, StartSel={_MARK_START}, StopSel={_MARK_STOP}"
+
+BACKFILL_BATCH = 200
+
+
+def highlight_snippet(headline: str | None) -> str:
+    """HTML-safe snippet: escaped summary text with matches wrapped in <mark>."""
+    return (
+        html.escape(headline or "")
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_STOP, "</mark>")
+    )
+
+
+def _config():
+    return cast(literal(SEARCH_CONFIG), REGCONFIG)
+
+
+def _slides_text(slides_payload) -> str:
+    if not isinstance(slides_payload, list):
+        return ""
+    return " ".join(
+        f"{s.get('title') or ''} {s.get('text') or ''}" for s in slides_payload if isinstance(s, dict)
+    )
+
+
+def _weighted(title, summary_text, slides_text):
+    return (
+        func.setweight(func.to_tsvector(_config(), title), "A")
+        .op("||")(func.setweight(func.to_tsvector(_config(), summary_text), "B"))
+        .op("||")(func.setweight(func.to_tsvector(_config(), slides_text), "C"))
+    )
+
+
+def search_document(title: str | None, summary_text: str | None, slides_payload=None):
+    """SQL expression for Summary.search_vector: title ranks above summary text, above slide text."""
+    return _weighted(title or "", summary_text or "", _slides_text(slides_payload))
+
+
+def search_document_params():
+    """search_document() over the bind parameters sv_title, sv_summary and sv_slides, for executemany."""
+    return _weighted(bindparam("sv_title"), bindparam("sv_summary"), bindparam("sv_slides"))
+
+
+def search_params(title: str | None, summary_text: str | None, slides_payload=None) -> dict:
+    return {"sv_title": title or "", "sv_summary": summary_text or "", "sv_slides": _slides_text(slides_payload)}
+
+
+def backfill_search_vectors(conn):
+    """Fill search_vector for rows saved before it existed.
+
+    Summary snapshots keep slide text in slide_blobs rather than inline, so the
+    text is hydrated in Python; a SQL-only backfill would index titles alone.
+    """
+    stmt = (
+        update(Summary)
+        .where(Summary.id == bindparam("b_id"))
+        .values(search_vector=search_document_params())
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(Summary.id, Summary.title, Summary.summary_text, Summary.slides_payload)
+            .where(Summary.search_vector.is_(None), Summary.id > last_id)
+            .order_by(Summary.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        conn.execute(stmt, [
+            {
+                "b_id": r.id,
+                **search_params(
+                    r.title,
+                    r.summary_text,
+                    hydrate_snapshot(conn, r.slides_payload) if isinstance(r.slides_payload, list) else None,
+                ),
+            }
+            for r in rows
+        ])
+        last_id = rows[-1].id
+
+
+def search_summaries_query(user_id: int, q: str, course_id: int | None, limit: int, offset: int):
+    """Ranked matches for `q`; headlines are only computed for the rows on the requested page."""
+    tsq = func.websearch_to_tsquery(_config(), q)
+    rank = func.ts_rank_cd(Summary.search_vector, tsq).label("rank")
+    inner = select(
+        Summary.id,
+        Summary.course_id,
+        Summary.title,
+        Summary.source_filename,
+        Summary.slide_count,
+        Summary.created_at,
+        Summary.summary_text,
+        rank,
+    ).where(Summary.user_id == user_id, Summary.search_vector.op("@@")(tsq))
+    if course_id:
+        inner = inner.where(Summary.course_id == course_id)
+    inner = inner.order_by(rank.desc(), Summary.id.desc()).limit(limit).offset(offset).subquery()
+    return select(
+        inner.c.id,
+        inner.c.course_id,
+        inner.c.title,
+        inner.c.source_filename,
+        inner.c.slide_count,
+        inner.c.created_at,
+        inner.c.rank,
+        func.ts_headline(
+            _config(), func.translate(inner.c.summary_text, _MARK_START + _MARK_STOP, ""), tsq, HEADLINE_OPTIONS
+        ).label("snippet"),
+    ).order_by(inner.c.rank.desc(), inner.c.id.desc())
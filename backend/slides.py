@@ -0,0 +1,192 @@
+import hashlib
+import json
+
+from sqlalchemy import select, text as sql, update
+
+from .blobs import blob_row, decode, insert_blobs
+from .models import Slide, SlideBlob
+
+
+def content_hash(title: str, text: str) -> str:
+    return hashlib.sha256(f"{title or ''}\n{text or ''}".encode("utf-8")).hexdigest()
+
+
+def format_summary(slides_payload: list[dict]) -> str:
+    """The chat-style deck summary; derived from slide bullets rather than stored."""
+    return "\n\n".join(
+        f"🧾 **Slide {sl['page']}: {sl['title']}**\n" + "\n".join(f"• {b}" for b in sl["bullets"])
+        for sl in slides_payload
+        if sl.get("bullets")
+    )
+
+
+def slide_rows(session_id: str, slides_payload: list[dict]) -> list[dict]:
+    """Column values for one slides row per page, usable with a bulk insert().
+
+    The text itself goes to slide_blobs (see slide_blob_rows). Token counting
+    runs the tokenizer, so call this off the event loop.
+    """
+    from .summarize import count_tokens  # loads the model; keep this module importable without it
+
+    rows = []
+    for s in slides_payload:
+        text = s.get("text") or ""
+        rows.append({
+            "session_id": session_id,
+            "page": s["page"],
+            "title": s.get("title"),
+            "text": None,
+            "bullets": s.get("bullets") or [],
+            "content_hash": content_hash(s.get("title"), text),
+            "token_count": count_tokens(text) if text else 0,
+            "duplicate_of": s.get("duplicate_of"),
+        })
+    return rows
+
+
+def slide_blob_rows(slides_payload: list[dict]) -> list[dict]:
+    return [
+        blob_row(content_hash(s.get("title"), s.get("text") or ""), s.get("text") or "")
+        for s in slides_payload
+    ]
+
+
+def summary_snapshot(slides_payload: list[dict]) -> list[dict]:
+    """A saved summary's own copy of its slides: bullets inline, text by content hash.
+
+    Summaries are immutable, so they must not read bullets back from the live
+    session rows; the text itself is shared with slide_blobs (see slide_blob_rows).
+    """
+    snapshot = []
+    for s in slides_payload:
+        entry = {
+            "page": s.get("page"),
+            "title": s.get("title"),
+            "content_hash": s.get("content_hash") or content_hash(s.get("title"), s.get("text") or ""),
+            "bullets": list(s.get("bullets") or []),
+        }
+        if s.get("duplicate_of") is not None:
+            entry["duplicate_of"] = s["duplicate_of"]
+        snapshot.append(entry)
+    return snapshot
+
+
+def hydrate_snapshot(db, snapshot: list[dict]) -> list[dict]:
+    """Turn a summary snapshot back into the per-slide payload shape.
+
+    Legacy inline entries, and anything that isn't a slide dict (slides_payload
+    used to be stored as posted), pass through untouched.
+    """
+    hashes = {
+        s["content_hash"] for s in snapshot
+        if isinstance(s, dict) and "text" not in s and s.get("content_hash")
+    }
+    blobs = {}
+    if hashes:
+        rows = db.execute(
+            select(SlideBlob.content_hash, SlideBlob.codec, SlideBlob.data).where(SlideBlob.content_hash.in_(hashes))
+        )
+        blobs = {b.content_hash: decode(b.codec, b.data) for b in rows}
+    out = []
+    for s in snapshot:
+        if not isinstance(s, dict) or "text" in s:
+            out.append(s)
+            continue
+        entry = {k: v for k, v in s.items() if k != "content_hash"}
+        entry["text"] = blobs.get(s.get("content_hash"), "")
+        out.append(entry)
+    return out
+
+
+SNAPSHOT_MIGRATION_BATCH = 200
+
+
+def migrate_summary_snapshots(conn):
+    """Give every saved summary its own snapshot.
+
+    Inline payloads are rewritten to reference blobs of the very same text, so
+    their content is unchanged. Summaries whose payload was cleared earlier
+    are frozen from their session's current slides rows.
+    """
+    last_id = 0
+    while True:
+        rows = conn.execute(sql(
+            "SELECT id, slides_payload FROM summaries WHERE id > :last AND jsonb_typeof(slides_payload) = 'array'"
+            " AND EXISTS (SELECT 1 FROM jsonb_array_elements(slides_payload) el WHERE el ? 'text')"
+            " ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": SNAPSHOT_MIGRATION_BATCH}).all()
+        if not rows:
+            break
+        blobs, updates = [], []
+        for r in rows:
+            blobs.extend(slide_blob_rows(r.slides_payload))
+            updates.append({"id": r.id, "payload": json.dumps(summary_snapshot(r.slides_payload))})
+        conn.execute(insert_blobs(blobs))
+        conn.execute(sql("UPDATE summaries SET slides_payload = CAST(:payload AS jsonb) WHERE id = :id"), updates)
+        last_id = rows[-1].id
+    conn.execute(sql("""
+        UPDATE summaries s SET slides_payload = (
+            SELECT jsonb_agg(jsonb_build_object(
+                       'page', sl.page, 'title', sl.title, 'content_hash', sl.content_hash, 'bullets', sl.bullets
+                   ) ORDER BY sl.page)
+            FROM slides sl WHERE sl.session_id = s.session_id
+        )
+        WHERE s.slides_payload IS NULL AND s.session_id IS NOT NULL
+          AND EXISTS (SELECT 1 FROM slides sl WHERE sl.session_id = s.session_id)
+    """))
+
+
+def build_slides(session_id: str, slides_payload: list[dict]) -> list[Slide]:
+    """Turn the JSON slide payload into one Slide row per page."""
+    return [Slide(**row) for row in slide_rows(session_id, slides_payload)]
+
+
+def slide_to_payload(slide: Slide, codec: int | None = None, data: bytes | None = None) -> dict:
+    """The per-slide JSON shape the frontend has always received."""
+    if slide.text is not None:
+        text = slide.text  # not yet moved to slide_blobs
+    else:
+        text = decode(codec, data) if data is not None else ""
+    payload = {
+        "page": slide.page,
+        "title": slide.title or "",
+        "text": text,
+        "bullets": slide.bullets or [],
+    }
+    if slide.duplicate_of is not None:
+        payload["duplicate_of"] = slide.duplicate_of
+    return payload
+
+
+def _slides_with_text():
+    return select(Slide, SlideBlob.codec, SlideBlob.data).outerjoin(
+        SlideBlob, SlideBlob.content_hash == Slide.content_hash
+    )
+
+
+def load_slides(db, session_id: str) -> list[dict]:
+    rows = db.execute(_slides_with_text().where(Slide.session_id == session_id).order_by(Slide.page))
+    return [slide_to_payload(*r) for r in rows]
+
+
+async def aload_slides(db, session_id: str) -> list[dict]:
+    rows = await db.execute(_slides_with_text().where(Slide.session_id == session_id).order_by(Slide.page))
+    return [slide_to_payload(*r) for r in rows]
+
+
+async def aget_slide(db, session_id: str, page: int) -> dict | None:
+    row = (
+        await db.execute(_slides_with_text().where(Slide.session_id == session_id, Slide.page == page))
+    ).first()
+    return slide_to_payload(*row) if row else None
+
+
+async def aupdate_slide_bullets(db, session_id: str, page: int, bullets: list[str]) -> bool:
+    """Rewrite one slide's bullets in place; returns False if the slide doesn't exist."""
+    result = await db.execute(
+        update(Slide)
+        .where(Slide.session_id == session_id, Slide.page == page)
+        .values(bullets=bullets)
+    )
+    await db.commit()
+    return result.rowcount > 0
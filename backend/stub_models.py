@@ -0,0 +1,56 @@
+"""Deterministic stand-ins for the Hugging Face pipelines, used when MODEL_BACKEND=stub.
+
+They keep the call signatures the real pipelines are used with, so benchmarks and
+load tests can exercise the full request path without downloading or running models.
+"""
+
+import os
+import re
+import time
+
+
+STUB_LATENCY_MS = float(os.getenv("STUB_MODEL_LATENCY_MS") or 0)
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _simulate_latency():
+    if STUB_LATENCY_MS > 0:
+        time.sleep(STUB_LATENCY_MS / 1000.0)
+
+
+class StubTokenizer:
+    """Approximates subword tokenization as ~1.3 tokens per word."""
+
+    def __call__(self, text, add_special_tokens=False, return_attention_mask=False, **kwargs):
+        if isinstance(text, list):
+            return {"input_ids": [self(t)["input_ids"] for t in text]}
+        n_words = len(_WORD_RE.findall(text or ""))
+        return {"input_ids": list(range(int(n_words * 1.3)))}
+
+
+class StubSummarizer:
+    """Extractive 'summary': the leading words of the input, cut near max_length tokens."""
+
+    def __call__(self, text, max_length=142, min_length=20, **kwargs):
+        if isinstance(text, list):
+            return [self(t, max_length=max_length, min_length=min_length)[0] for t in text]
+        _simulate_latency()
+        words = _WORD_RE.findall(text or "")
+        keep = max(1, int(max_length / 1.3))
+        summary = " ".join(words[:keep])
+        if summary and not summary.endswith((".", "!", "?")):
+            summary += "."
+        return [{"summary_text": summary}]
+
+
+class StubText2Text:
+    """Echo-style generator for the flan-t5 QA/explain pipeline."""
+
+    def __call__(self, prompt, max_length=256, **kwargs):
+        if isinstance(prompt, list):
+            return [self(p, max_length=max_length)[0] for p in prompt]
+        _simulate_latency()
+        words = _WORD_RE.findall(prompt or "")
+        tail = " ".join(words[-min(len(words), max_length // 4):])
+        return [{"generated_text": f"(stub) {tail}"}]
@@ -1,10 +1,28 @@
 
+import os
 import re
-from transformers import pipeline, AutoTokenizer
 
-MODEL = "sshleifer/distilbart-cnn-12-6"
-tokenizer = AutoTokenizer.from_pretrained(MODEL, use_fast=True)
-summarizer = pipeline("summarization", model=MODEL, tokenizer=tokenizer)
+from .metrics import STAGE_SECONDS
+
+# MODEL_BACKEND=stub swaps in deterministic stand-ins (see stub_models.py) for
+# benchmarks and load tests; MODEL_BACKEND=server forwards calls to a shared
+# model server (see model_server.py); SUMMARIZER_MODEL allows a smaller checkpoint.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "hf")
+MODEL = os.getenv("SUMMARIZER_MODEL", "sshleifer/distilbart-cnn-12-6")
+if MODEL_BACKEND == "stub":
+    from .stub_models import StubSummarizer, StubTokenizer
+    tokenizer = StubTokenizer()
+    summarizer = StubSummarizer()
+elif MODEL_BACKEND == "server":
+    from .model_server import OP_SUMMARIZE, RemotePipeline, RemoteTokenizer
+    tokenizer = RemoteTokenizer()
+    summarizer = RemotePipeline(OP_SUMMARIZE)
+else:
+    from .resources import apply_resource_limits
+    apply_resource_limits()
+    from transformers import pipeline, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(MODEL, use_fast=True)
+    summarizer = pipeline("summarization", model=MODEL, tokenizer=tokenizer)
 
 SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
 CONTROL_CHARS = re.compile(r"[\u200B-\u200D\uFEFF\x00-\x1F\x7F]")
@@ -29,6 +47,26 @@ def _to_bullets(text: str, max_items: int) -> list[str]:
             break
     return bullets or ([text] if text else [])
 
+def count_tokens(text: str) -> int:
+    return len(tokenizer(text, add_special_tokens=False, return_attention_mask=False)["input_ids"])
+
+GENERATION_KWARGS = dict(
+    no_repeat_ngram_size=3,
+    num_beams=4,
+    do_sample=False,
+    length_penalty=1.05,
+    early_stopping=True,
+)
+
+def _length_limits(words: int, input_tokens: int, ratio: float) -> tuple[int, int]:
+    target_words = max(40, min(int(words * ratio), 220))
+    approx_max_tok = int(target_words * 1.3)
+    max_len = min(max(30, approx_max_tok), int(input_tokens * 0.9))
+    min_len = max(20, int(max_len * 0.75))
+    if min_len >= max_len:
+        min_len = max(12, int(max_len * 0.6))
+    return max_len, min_len
+
 def summarize_slide(text: str, ratio: float = 0.65, max_bullets: int = 10) -> list[str]:
    
     text = _normalize(text)
@@ -41,27 +79,48 @@ def summarize_slide(text: str, ratio: float = 0.65, max_bullets: int = 10) -> li
         
         return [text]
 
-    enc = tokenizer(text, add_special_tokens=False, return_attention_mask=False)
-    input_tokens = len(enc["input_ids"])
-
-   
-    target_words = max(40, min(int(words * ratio), 220))
-   
-    approx_max_tok = int(target_words * 1.3)
-    max_len = min(max(30, approx_max_tok), int(input_tokens * 0.9))
-    min_len = max(20, int(max_len * 0.75))
-    if min_len >= max_len:
-        min_len = max(12, int(max_len * 0.6))
+    with STAGE_SECONDS.time(stage="summarize_slide_tokenize"):
+        enc = tokenizer(text, add_special_tokens=False, return_attention_mask=False)
+    max_len, min_len = _length_limits(words, len(enc["input_ids"]), ratio)
 
-    out = summarizer(
-        text,
-        max_length=max_len,
-        min_length=min_len,
-        no_repeat_ngram_size=3,
-        num_beams=4,
-        do_sample=False,
-        length_penalty=1.05,   
-        early_stopping=True,
-    )[0]["summary_text"].strip()
+    with STAGE_SECONDS.time(stage="summarize_slide_generate"):
+        out = summarizer(text, max_length=max_len, min_length=min_len, **GENERATION_KWARGS)[0]["summary_text"].strip()
 
     return _to_bullets(out, max_items=max_bullets)
+
+def summarize_slides(texts: list[str], ratio: float = 0.65, max_bullets: int = 10, batch_size: int = 8) -> list[list[str]]:
+    """Batched summarize_slide for offline jobs.
+
+    One pipeline call shares its length limits, so texts are sorted by token
+    budget and each batch uses the tightest limits of its members.
+    """
+    results: list[list[str] | None] = [None] * len(texts)
+    pending = []
+    for i, raw in enumerate(texts):
+        text = _normalize(raw)
+        if not text:
+            results[i] = ["⚠️ No readable text found on this slide."]
+        elif len(text.split()) < 25:
+            results[i] = [text]
+        else:
+            pending.append((i, text))
+    if not pending:
+        return results
+
+    with STAGE_SECONDS.time(stage="summarize_slide_tokenize"):
+        enc = tokenizer([t for _, t in pending], add_special_tokens=False, return_attention_mask=False)
+    limits = [
+        _length_limits(len(t.split()), len(ids), ratio) for (_, t), ids in zip(pending, enc["input_ids"])
+    ]
+    order = sorted(range(len(pending)), key=lambda k: limits[k][0])
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        max_len = min(limits[k][0] for k in batch)
+        min_len = min(min(limits[k][1] for k in batch), max(1, max_len - 1))
+        with STAGE_SECONDS.time(stage="summarize_slide_generate"):
+            outs = summarizer(
+                [pending[k][1] for k in batch], max_length=max_len, min_length=min_len, **GENERATION_KWARGS
+            )
+        for k, out in zip(batch, outs):
+            results[pending[k][0]] = _to_bullets(out["summary_text"].strip(), max_items=max_bullets)
+    return results
@@ -0,0 +1,43 @@
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+logger = logging.getLogger("ai_lecture_app")
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+def new_request_id(incoming: str | None = None) -> str:
+    if incoming and len(incoming) <= 128 and incoming.isprintable():
+        return incoming
+    return uuid.uuid4().hex
+
+
+def current_request_id() -> str | None:
+    return request_id_var.get()
+
+
+@contextmanager
+def span(name: str, **fields):
+    """Time a block and log it as one structured JSON record tagged with the request id."""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield fields
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        record = {
+            "event": "span",
+            "request_id": request_id_var.get(),
+            "span": name,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            "status": status,
+            **fields,
+        }
+        logger.info(json.dumps(record, default=str), extra={"span": record})
@@ -0,0 +1,146 @@
+import hashlib
+import io
+import mmap
+import os
+from contextlib import contextmanager
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from .pptx_text import extract_text_by_slide
+
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB") or 50) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB") or 256) * 1024
+
+
+class SpooledUpload:
+    """An uploaded file's spooled temp file, with its size and sha256."""
+
+    def __init__(self, filename: str, spool, size: int, sha256: str):
+        self.filename = filename
+        self.spool = spool
+        self.size = size
+        self.sha256 = sha256
+
+    def close(self):
+        self.spool.close()
+
+
+class _MmapReader(io.RawIOBase):
+    """Read-only seekable view over an mmap, so zipfile can read it without copying."""
+
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._mm.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mm.seek(offset, whence)
+        return self._mm.tell()
+
+    def tell(self):
+        return self._mm.tell()
+
+
+def too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large (limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)",
+    )
+
+
+class UploadSizeLimit:
+    """ASGI middleware that caps request bodies while they stream in.
+
+    Content-Length is checked up front; chunked bodies are counted as they are
+    received and the request fails with 413 once the cap is passed, before the
+    multipart parser spools the rest.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES + UPLOAD_CHUNK_SIZE):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            exc = too_large()
+            response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    """Hash the upload and enforce MAX_UPLOAD_BYTES without copying it.
+
+    The multipart parser has already written the file to its own spooled
+    temp file; that file is taken over rather than written a second time.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        await file.seek(0)
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise too_large()
+            digest.update(chunk)
+        await file.seek(0)
+    except BaseException:
+        await file.close()
+        raise
+    return SpooledUpload(file.filename, file.file, size, digest.hexdigest())
+
+
+@contextmanager
+def open_for_parsing(upload: SpooledUpload):
+    """Yield a file object for the upload, memory-mapped once it has spilled to disk."""
+    spool = upload.spool
+    if not getattr(spool, "_rolled", False) or upload.size == 0:
+        spool.seek(0)
+        yield spool
+        return
+    mm = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield io.BufferedReader(_MmapReader(mm), buffer_size=UPLOAD_CHUNK_SIZE)
+    finally:
+        mm.close()
+
+
+def _extract(upload: SpooledUpload):
+    with open_for_parsing(upload) as fh:
+        return extract_text_by_slide(fh)
+
+
+async def extract_upload(upload: SpooledUpload):
+    """Parse the uploaded deck in a worker thread so the event loop stays free."""
+    return await run_in_threadpool(_extract, upload)
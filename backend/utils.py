@@ -1,81 +1,38 @@
 
-import re
+import asyncio
 import uuid
-from pptx import Presentation
-from collections import Counter
-from .database import SessionLocal
+from sqlalchemy import select
+from .database import AsyncSessionLocal, SessionLocal
+from .metrics import gauge
 from .models import LectureSession
+from .pptx_text import extract_text_by_slide  # noqa: F401  (re-exported)
+from .blobs import insert_blobs
+from .slides import aload_slides, build_slides, format_summary, load_slides, slide_blob_rows
 sessions: dict[str, dict] = {}
 
-FOOTER_PATTERNS = [
-    r"https?://\S+",
-    r"\b\S+@\S+\b",
-    r"©|copyright",
-    r"\b(all rights reserved)\b",
-]
-FOOTER_RE = re.compile("|".join(FOOTER_PATTERNS), re.I)
+gauge("lecture_sessions_in_memory", "Lecture sessions held in the in-process cache.", fn=lambda: len(sessions))
 
-def _clean_lines(lines: list[str]) -> list[str]:
-    cleaned = []
-    for line in lines:
-        if not line:
-            continue
-        line = re.sub(r"[\u200B-\u200D\uFEFF\x00-\x1F\x7F]", " ", line)
-        line = re.sub(r"\s+", " ", line).strip()
-        if not line:
-            continue
-        
-        if re.fullmatch(r"\d{1,3}", line) or re.match(r"^\s*slide\s+\d+\s*$", line, re.I):
-            continue
-        if FOOTER_RE.search(line):
-            continue
-        cleaned.append(line)
-    return cleaned
-
-def extract_text_by_slide(file):
-    prs = Presentation(file)
-    slides = []
-
-    raw_per_slide = []
-    for slide in prs.slides:
-        lines = []
-        for shape in slide.shapes:
-            
-            if hasattr(shape, "text_frame") and shape.text_frame:
-                for p in shape.text_frame.paragraphs:
-                    if p.text and p.text.strip():
-                        lines.append(p.text.strip())
-            
-            if getattr(shape, "shape_type", None) == 19: 
-                for row in shape.table.rows:
-                    for cell in row.cells:
-                        if cell.text and cell.text.strip():
-                            lines.append(cell.text.strip())
-            
-            if hasattr(shape, "shapes"):
-                for s in shape.shapes:
-                    if hasattr(s, "text_frame") and s.text_frame:
-                        for p in s.text_frame.paragraphs:
-                            if p.text and p.text.strip():
-                                lines.append(p.text.strip())
-        raw_per_slide.append(lines)
-
-    
-    all_lines = [ln for lines in raw_per_slide for ln in lines]
-    norm = lambda t: re.sub(r"\s+", " ", t.strip().lower())
-    counts = Counter(norm(t) for t in all_lines if t and len(t) > 10)
-    common = {t for t, c in counts.items() if c >= 3}  # appears on ≥3 slides
+def _remember_session(
+    sid: str,
+    pptx_text: str,
+    summary_text: str,
+    slides_payload: list[dict] | None,
+    digest: dict | None = None,
+) -> dict:
+    sessions[sid] = {
+        "pptx_text": pptx_text,
+        "summary": summary_text,
+        "slides": slides_payload or [],
+        "digest": digest,
+        "chat_history": [],
+    }
+    return sessions[sid]
 
-    for i, lines in enumerate(raw_per_slide, start=1):
-        title = ""
-        
-        lines = _clean_lines(lines)
-        lines = [ln for ln in lines if norm(ln) not in common]
-        if lines:
-            title = lines[0]
-        body = "\n".join(lines[1:]).strip() if len(lines) > 1 else ""
-        slides.append({"page": i, "title": title or f"Slide {i}", "text": body})
-    return slides
+def _remember_loaded(sid: str, db_sess: LectureSession, slides: list[dict]) -> dict:
+    # Only legacy sessions store the joined text and summary; rebuild them otherwise.
+    pptx_text = db_sess.pptx_text or " ".join(s.get("text") or "" for s in slides)
+    summary_text = db_sess.summary_text or format_summary(slides)
+    return _remember_session(sid, pptx_text, summary_text, slides, db_sess.digest)
 
 def create_session(
     pptx_text: str,
@@ -89,25 +46,41 @@ def create_session(
     # Save to DB
     db = SessionLocal()
     try:
-        db_sess = LectureSession(
-            id=sid,
-            user_id=user_id,
-            pptx_text=pptx_text,
-            summary_text=summary_text,
-            slides_payload=slides_payload or [],
-        )
+        db_sess = LectureSession(id=sid, user_id=user_id)
         db.add(db_sess)
+        db.flush()
+        if slides_payload:
+            db.execute(insert_blobs(slide_blob_rows(slides_payload)))
+        db.add_all(build_slides(sid, slides_payload or []))
         db.commit()
     finally:
         db.close()
 
     # Also keep in memory for chat_history
-    sessions[sid] = {
-        "pptx_text": pptx_text,
-        "summary": summary_text,
-        "slides": slides_payload or [],
-        "chat_history": [],
-    }
+    _remember_session(sid, pptx_text, summary_text, slides_payload)
+    return sid
+
+def _session_rows(sid: str, slides_payload: list[dict] | None) -> tuple[list, list[dict]]:
+    """Slide rows (tokenized) and compressed blob rows; CPU-bound, so run in a thread from async code."""
+    return build_slides(sid, slides_payload or []), slide_blob_rows(slides_payload or [])
+
+async def acreate_session(
+    pptx_text: str,
+    summary_text: str,
+    slides_payload: list[dict] | None = None,
+    user_id: int | None = None,
+) -> str:
+    """Async variant of create_session for use inside async endpoints."""
+    sid = str(uuid.uuid4())
+    slide_objs, blob_rows = await asyncio.to_thread(_session_rows, sid, slides_payload)
+    async with AsyncSessionLocal() as db:
+        db.add(LectureSession(id=sid, user_id=user_id))
+        await db.flush()
+        if blob_rows:
+            await db.execute(insert_blobs(blob_rows))
+        db.add_all(slide_objs)
+        await db.commit()
+    _remember_session(sid, pptx_text, summary_text, slides_payload)
     return sid
 
 def get_session(session_id: str) -> dict | None:
@@ -120,14 +93,23 @@ def get_session(session_id: str) -> dict | None:
         db_sess = db.query(LectureSession).filter(LectureSession.id == session_id).first()
         if not db_sess:
             return None
-        # Reconstruct in-memory copy (no chat history persisted yet)
-        sess = {
-            "pptx_text": db_sess.pptx_text,
-            "summary": db_sess.summary_text or "",
-            "slides": db_sess.slides_payload or [],
-            "chat_history": [],
-        }
-        sessions[session_id] = sess
-        return sess
+        # Reconstruct in-memory copy (no chat history persisted yet);
+        # sessions stored before the slides table fall back to the JSON payload.
+        slides = load_slides(db, session_id) or db_sess.slides_payload or []
+        return _remember_loaded(session_id, db_sess, slides)
     finally:
         db.close()
+
+async def aget_session(session_id: str) -> dict | None:
+    """Async variant of get_session for use inside async endpoints."""
+    if session_id in sessions:
+        return sessions[session_id]
+
+    async with AsyncSessionLocal() as db:
+        db_sess = (
+            await db.execute(select(LectureSession).where(LectureSession.id == session_id))
+        ).scalars().first()
+        if not db_sess:
+            return None
+        slides = await aload_slides(db, session_id) or db_sess.slides_payload or []
+        return _remember_loaded(session_id, db_sess, slides)
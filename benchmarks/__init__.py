@@ -0,0 +1,4 @@
+"""Reproducible benchmarks for extraction, summarization and the HTTP endpoints.
+
+Run with ``python -m benchmarks.run``; see ``benchmarks/run.py`` for options.
+"""
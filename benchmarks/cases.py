@@ -0,0 +1,161 @@
+"""Benchmark cases. Each case does its setup once and returns the callable to time."""
+
+import io
+
+from .corpus import DECK_SIZES, deck_path
+
+
+QUICK_SIZES = (10, 50)
+QUESTION = "How does the scheduler use a queue and a lock to protect the cache?"
+
+CASES: dict[str, tuple] = {}
+
+
+def case(name: str, group: str):
+    def register(fn):
+        CASES[name] = (group, fn)
+        return fn
+    return register
+
+
+def _deck_bytes(n: int) -> bytes:
+    with open(deck_path(n), "rb") as fh:
+        return fh.read()
+
+
+def _extracted(n: int) -> list[dict]:
+    from backend.pptx_text import extract_text_by_slide
+    return extract_text_by_slide(io.BytesIO(_deck_bytes(n)))
+
+
+for _n in DECK_SIZES:
+    def _make_extract(n=_n):
+        def setup():
+            from backend.pptx_text import extract_text_by_slide
+            data = _deck_bytes(n)
+            return lambda: extract_text_by_slide(io.BytesIO(data))
+        return setup
+
+    def _make_clean(n=_n):
+        def setup():
+            from pptx import Presentation
+            from backend.pptx_text import _clean_lines
+            prs = Presentation(io.BytesIO(_deck_bytes(n)))
+            per_slide = [
+                [p.text for sh in slide.shapes if sh.has_text_frame for p in sh.text_frame.paragraphs]
+                for slide in prs.slides
+            ]
+            return lambda: [_clean_lines(lines) for lines in per_slide]
+        return setup
+
+    def _make_pick(n=_n):
+        def setup():
+            from backend.app import pick_relevant_slides
+            slides = [dict(s, bullets=s["text"].split("\n")[:3]) for s in _extracted(n)]
+            return lambda: pick_relevant_slides(QUESTION, slides)
+        return setup
+
+    def _make_read(n=_n):
+        def setup():
+            from backend.blobs import decode
+            from backend.slides import slide_blob_rows
+            blobs = slide_blob_rows(_extracted(n))
+            return lambda: [decode(b["codec"], b["data"]) for b in blobs]
+        return setup
+
+    case(f"extract_text_by_slide[{_n}]", "extract")(_make_extract())
+    case(f"_clean_lines[{_n}]", "extract")(_make_clean())
+    case(f"read_slide_text[{_n}]", "storage")(_make_read())
+    case(f"pick_relevant_slides[{_n}]", "chat")(_make_pick())
+
+
+@case("summarize_slide[10 slides]", "summarize")
+def _summarize():
+    from backend.summarize import summarize_slide
+    texts = [s["text"] for s in _extracted(10) if s["text"]]
+    return lambda: [summarize_slide(t, ratio=0.65, max_bullets=10) for t in texts]
+
+
+def _client():
+    from fastapi.testclient import TestClient
+    from backend.app import app
+    return TestClient(app)
+
+
+@case("POST /api/extract[50]", "endpoints")
+def _extract_endpoint():
+    client = _client()
+    data = _deck_bytes(50)
+    files = {"file": ("deck.pptx", data, "application/vnd.openxmlformats-officedocument.presentationml.presentation")}
+
+    def run():
+        r = client.post("/api/extract", files=files)
+        r.raise_for_status()
+    return run
+
+
+def _session_id(client) -> str:
+    r = client.post(
+        "/api/extract",
+        files={"file": ("deck.pptx", _deck_bytes(10), "application/octet-stream")},
+    )
+    r.raise_for_status()
+    return r.json()["session_id"]
+
+
+@case("POST /api/summarize/slide", "endpoints")
+def _summarize_endpoint():
+    client = _client()
+    sid = _session_id(client)
+    text = next(s["text"] for s in _extracted(10) if s["text"])
+
+    def run():
+        r = client.post("/api/summarize/slide", data={"session_id": sid, "page": 1, "title": "t", "text": text})
+        r.raise_for_status()
+    return run
+
+
+@case("POST /api/chat (question)", "endpoints")
+def _chat_question():
+    client = _client()
+    sid = _session_id(client)
+
+    def run():
+        r = client.post("/api/chat", data={"message": QUESTION, "session_id": sid})
+        r.raise_for_status()
+    return run
+
+
+@case("POST /api/chat (explain slide)", "endpoints")
+def _chat_explain():
+    client = _client()
+    sid = _session_id(client)
+
+    def run():
+        r = client.post("/api/chat", data={"message": "explain slide 3", "session_id": sid})
+        r.raise_for_status()
+    return run
+
+
+def selected_cases(quick: bool, pattern: str | None, skip_groups: set[str]):
+    for name, (group, setup) in CASES.items():
+        if group in skip_groups:
+            continue
+        if pattern and pattern not in name:
+            continue
+        if quick and "[" in name:
+            size = name.rsplit("[", 1)[1].rstrip("]")
+            if size.isdigit() and int(size) not in QUICK_SIZES:
+                continue
+        yield name, group, setup
+
+
+def database_available() -> bool:
+    try:
+        from sqlalchemy import text
+        from backend.database import engine
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
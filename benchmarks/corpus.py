@@ -0,0 +1,91 @@
+"""Synthetic PPTX decks with the shapes real lecture decks contain.
+
+Every deck is generated from a fixed seed, so the same size always yields byte-
+for-byte comparable content: title + bullet slides, a table every 7th slide, a
+group shape every 5th slide and a footer repeated on every slide (which
+``extract_text_by_slide`` is expected to strip).
+"""
+
+import io
+import os
+import random
+
+try:
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+except ImportError:
+    raise SystemExit("benchmarks need python-pptx to build the decks: pip install -r requirements.txt") from None
+
+
+DECK_SIZES = (10, 50, 100, 250, 500)
+
+_VOCAB = (
+    "algorithm data structure memory cache latency throughput network protocol "
+    "gradient descent model training inference matrix vector kernel process thread "
+    "lock queue scheduler database index transaction query optimizer compiler parser "
+    "token grammar proof theorem lemma invariant recursion induction graph tree heap "
+    "hash table probability distribution variance estimate sample population hypothesis"
+).split()
+
+FOOTER = "Introduction to Computer Science - Lecture Notes - Week 3"
+
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 18) -> str:
+    words = [rng.choice(_VOCAB) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def build_deck(n_slides: int, seed: int = 0) -> bytes:
+    """Return the bytes of a synthetic deck with `n_slides` slides."""
+    rng = random.Random(f"{seed}:{n_slides}")
+    prs = Presentation()
+    layout = prs.slide_layouts[1]  # Title and Content
+
+    for i in range(1, n_slides + 1):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Topic {i}: {rng.choice(_VOCAB).title()} {rng.choice(_VOCAB).title()}"
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng)
+        for _ in range(rng.randint(2, 5)):
+            body.add_paragraph().text = _sentence(rng)
+
+        if i % 7 == 0:
+            rows, cols = 4, 3
+            table = slide.shapes.add_table(rows, cols, Inches(1), Inches(4.5), Inches(6), Inches(1.5)).table
+            for r in range(rows):
+                for c in range(cols):
+                    table.cell(r, c).text = f"{rng.choice(_VOCAB)} {r}.{c}"
+
+        if i % 5 == 0:
+            group = slide.shapes.add_group_shape()
+            for j in range(3):
+                box = group.shapes.add_textbox(Inches(0.5 + 2 * j), Inches(6), Inches(2), Inches(0.5))
+                box.text_frame.text = _sentence(rng, 4, 8)
+
+        footer = slide.shapes.add_textbox(Inches(0.5), Inches(7), Inches(9), Inches(0.4))
+        footer.text_frame.text = FOOTER
+        footer.text_frame.paragraphs[0].runs[0].font.size = Pt(10)
+        number = slide.shapes.add_textbox(Inches(9.3), Inches(7), Inches(0.5), Inches(0.4))
+        number.text_frame.text = str(i)
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+def corpus_dir() -> str:
+    return os.getenv("BENCH_CORPUS_DIR") or os.path.join(os.path.dirname(__file__), ".corpus")
+
+
+def deck_path(n_slides: int, seed: int = 0) -> str:
+    """Path to a cached copy of the deck, generating it on first use."""
+    directory = corpus_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"deck-{n_slides}-s{seed}.pptx")
+    if not os.path.exists(path):
+        data = build_deck(n_slides, seed)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    return path
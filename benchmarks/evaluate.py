@@ -0,0 +1,162 @@
+"""Quality versus speed of summarize_slide settings on reference slides.
+
+    python -m benchmarks.evaluate --engines stub              # dry run, no models
+    python -m benchmarks.evaluate --beams 1 2 4 --ratios 0.5 0.65 0.8
+    python -m benchmarks.evaluate --engines hf:sshleifer/distilbart-cnn-12-6 hf:sshleifer/distilbart-cnn-6-6
+    python -m benchmarks.evaluate --corpus my_slides.json --output eval.json
+
+The corpus is a JSON list of {"id", "title", "text", "bullets"} where bullets
+are the reference summary (default: benchmarks/references/slides.json).
+Every engine ("hf", "hf:<checkpoint>", "server" or "stub") runs in its own
+spawned process, since the model is chosen at import time; beams and ratio
+vary inside it. Scores are ROUGE F1 of the joined bullets against the joined
+reference bullets. Rows marked * are Pareto-optimal: no other configuration
+is both faster (p50 latency) and better (ROUGE-L).
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "references", "slides.json")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _f1(overlap: int, cand: int, ref: int) -> float:
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / cand, overlap / ref
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(cand: list[str], ref: list[str], n: int) -> float:
+    c = Counter(tuple(cand[i:i + n]) for i in range(len(cand) - n + 1))
+    r = Counter(tuple(ref[i:i + n]) for i in range(len(ref) - n + 1))
+    return _f1(sum((c & r).values()), sum(c.values()), sum(r.values()))
+
+
+def rouge_l(cand: list[str], ref: list[str]) -> float:
+    prev = [0] * (len(ref) + 1)
+    for a in cand:
+        row = [0]
+        for j, b in enumerate(ref):
+            row.append(prev[j] + 1 if a == b else max(prev[j + 1], row[j]))
+        prev = row
+    return _f1(prev[-1], len(cand), len(ref))
+
+
+def score(bullets: list[str], reference: list[str]) -> dict:
+    cand, ref = _words(" ".join(bullets)), _words(" ".join(reference))
+    return {"rouge1": rouge_n(cand, ref, 1), "rouge2": rouge_n(cand, ref, 2), "rougeL": rouge_l(cand, ref)}
+
+
+def _engine_env(engine: str) -> dict:
+    backend, _, model = engine.partition(":")
+    env = {"MODEL_BACKEND": backend}
+    if model:
+        env["SUMMARIZER_MODEL"] = model
+    return env
+
+
+def _run_engine(engine: str, corpus: list[dict], beams: list[int], ratios: list[float],
+                max_bullets: int, repeats: int) -> list[dict]:
+    """Runs in a fresh process: load the engine's model once, then sweep beams x ratios."""
+    os.environ.update(_engine_env(engine))
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-unused")
+    from backend import summarize
+
+    summarize.summarize_slide(corpus[0]["text"])  # keeps model loading out of the timings
+    rows = []
+    for num_beams in beams:
+        summarize.GENERATION_KWARGS.update(num_beams=num_beams, early_stopping=num_beams > 1)
+        for ratio in ratios:
+            latencies, out_tokens, scores, counts, count_err, bullet_words = [], 0, [], [], [], []
+            for slide in corpus:
+                samples = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    bullets = summarize.summarize_slide(slide["text"], ratio=ratio, max_bullets=max_bullets)
+                    samples.append(time.perf_counter() - start)
+                latencies.append(statistics.median(samples))
+                out_tokens += summarize.count_tokens(" ".join(bullets))
+                scores.append(score(bullets, slide["bullets"]))
+                counts.append(len(bullets))
+                count_err.append(abs(len(bullets) - len(slide["bullets"])))
+                bullet_words.extend(len(b.split()) for b in bullets)
+            latencies.sort()
+            rows.append({
+                "engine": engine,
+                "num_beams": num_beams,
+                "ratio": ratio,
+                **{k: round(statistics.fmean(s[k] for s in scores), 4) for k in ("rouge1", "rouge2", "rougeL")},
+                "bullets_mean": round(statistics.fmean(counts), 2),
+                "bullet_count_error": round(statistics.fmean(count_err), 2),
+                "words_per_bullet": round(statistics.fmean(bullet_words), 1) if bullet_words else 0.0,
+                "latency_ms_p50": round(statistics.median(latencies) * 1000, 2),
+                "latency_ms_p95": round(latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))] * 1000, 2),
+                "tokens_per_s": round(out_tokens / sum(latencies), 1) if sum(latencies) else None,
+            })
+    return rows
+
+
+def mark_pareto(rows: list[dict], quality: str = "rougeL", cost: str = "latency_ms_p50") -> list[dict]:
+    for r in rows:
+        r["pareto"] = not any(
+            o[quality] >= r[quality] and o[cost] <= r[cost] and (o[quality] > r[quality] or o[cost] < r[cost])
+            for o in rows
+        )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--engines", nargs="+", default=["hf"])
+    parser.add_argument("--beams", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.5, 0.65, 0.8])
+    parser.add_argument("--max-bullets", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=1, help="timed runs per slide; the median is kept")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.corpus, encoding="utf-8") as fh:
+        corpus = json.load(fh)
+
+    rows = []
+    for engine in args.engines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            rows.extend(pool.submit(
+                _run_engine, engine, corpus, args.beams, args.ratios, args.max_bullets, args.repeats
+            ).result())
+    rows = sorted(mark_pareto(rows), key=lambda r: r["latency_ms_p50"])
+
+    header = (f"  {'engine':<36}{'beams':>6}{'ratio':>7}{'R-1':>7}{'R-2':>7}{'R-L':>7}"
+              f"{'bullets':>9}{'p50 ms':>10}{'p95 ms':>10}{'tok/s':>8}")
+    print(f"{len(corpus)} slides from {args.corpus}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{'*' if r['pareto'] else ' '} {r['engine']:<36}{r['num_beams']:>6}{r['ratio']:>7}"
+              f"{r['rouge1']:>7.3f}{r['rouge2']:>7.3f}{r['rougeL']:>7.3f}{r['bullets_mean']:>9}"
+              f"{r['latency_ms_p50']:>10.1f}{r['latency_ms_p95']:>10.1f}{r['tokens_per_s'] or 0:>8.0f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"corpus": args.corpus, "slides": len(corpus), "results": rows}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
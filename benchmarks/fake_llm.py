@@ -0,0 +1,97 @@
+"""Stand-in for the OpenAI chat completions API, for load tests.
+
+    python -m benchmarks.fake_llm --port 8765 --latency-ms 800
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1.
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CANNED = (
+    "Title:\nPractice Set\n\nInstructions:\nAnswer every question using the lecture.\n\n"
+    "Part A - Short Answer Questions:\n1. Define the main concept.\n2. Give an example.\n"
+    "3. Explain the trade-off.\n4. Describe the process.\n5. Name two limitations.\n\n"
+    "Part B - Analytical Questions:\n1. Compare the approaches.\n2. Evaluate the claim.\n"
+    "3. Argue for one design.\n\nPart C - Application Task:\nApply the method to a new case."
+)
+
+
+def make_handler(latency_s: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+            else:
+                self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            time.sleep(latency_s)
+            prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+            self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": CANNED},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_chars // 4,
+                    "completion_tokens": len(CANNED) // 4,
+                    "total_tokens": (prompt_chars + len(CANNED)) // 4,
+                },
+            })
+
+    return Handler
+
+
+def start_server(port: int = 0, latency_ms: float = 500.0):
+    """Start the server on a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms / 1000.0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    args = parser.parse_args(argv)
+    server, url = start_server(args.port, args.latency_ms)
+    print(f"fake LLM listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
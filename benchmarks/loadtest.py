@@ -0,0 +1,249 @@
+"""Replay a classroom scenario against a running app and report per-endpoint latency.
+
+    # app already running with MODEL_BACKEND=stub and OPENAI_BASE_URL set:
+    python -m benchmarks.loadtest --scenario benchmarks/scenarios/lecture_hall.json
+
+    # or let the harness start a stand-in LLM server and a stubbed uvicorn app:
+    python -m benchmarks.loadtest --start-app --users 40
+
+Each virtual user is a thread with its own HTTP session that walks the
+scenario's steps. Results are p50/p95/p99 latency, throughput and error rate
+per endpoint; --output writes the same numbers as JSON.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+from .corpus import build_deck
+from .fake_llm import start_server
+
+
+DEFAULT_SCENARIO = os.path.join(os.path.dirname(__file__), "scenarios", "lecture_hall.json")
+QUESTIONS = (
+    "What is the main idea of this lecture?",
+    "How does the scheduler use the queue?",
+    "Give me a quick recap of the whole lecture",
+    "Why does the cache reduce latency?",
+    "What is the difference between a process and a thread?",
+)
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.samples[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank percentile
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, deck: bytes, scenario: dict, recorder: Recorder, rng: random.Random):
+        self.base_url = base_url.rstrip("/")
+        self.deck = deck
+        self.scenario = scenario
+        self.recorder = recorder
+        self.rng = rng
+        self.http = requests.Session()
+        self.headers = {}
+        self.session_id = None
+        self.slides = []
+
+    def _call(self, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            resp = self.http.request(method, self.base_url + path, headers=self.headers, timeout=300, **kwargs)
+            body = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
+            ok = resp.ok and not (isinstance(body, dict) and body.get("error"))
+            return body if ok else None
+        except (requests.RequestException, ValueError):
+            return None
+        finally:
+            self.recorder.record(endpoint, time.perf_counter() - start, ok)
+
+    def _think(self):
+        low, high = self.scenario.get("think_time_s", [0, 0])
+        if high > 0:
+            time.sleep(self.rng.uniform(low, high))
+
+    def register_login(self, step):
+        email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        password = "loadtest-password"
+        self._call("POST /api/auth/register", "POST", "/api/auth/register",
+                   json={"email": email, "password": password, "full_name": "Load Test"})
+        body = self._call("POST /api/auth/login", "POST", "/api/auth/login",
+                          json={"email": email, "password": password})
+        if body:
+            self.headers["Authorization"] = f"Bearer {body['access_token']}"
+
+    def upload(self, step):
+        body = self._call("POST /api/extract", "POST", "/api/extract",
+                          files={"file": ("lecture.pptx", self.deck, "application/octet-stream")})
+        if body:
+            self.session_id = body["session_id"]
+            self.slides = body["slides"]
+
+    def summarize_slides(self, step):
+        for s in self.slides[: step.get("max_slides", len(self.slides))]:
+            self._call("POST /api/summarize/slide", "POST", "/api/summarize/slide", data={
+                "session_id": self.session_id, "page": s["page"], "title": s["title"], "text": s["text"],
+            })
+
+    def _chat(self, endpoint: str, message: str):
+        self._call(endpoint, "POST", "/api/chat", data={"message": message, "session_id": self.session_id})
+
+    def explain_slide(self, step):
+        page = self.rng.randint(1, max(1, len(self.slides)))
+        self._chat("POST /api/chat (explain slide)", f"explain slide {page}")
+
+    def question(self, step):
+        self._chat("POST /api/chat (question)", self.rng.choice(QUESTIONS))
+
+    def generate_quiz(self, step):
+        self._chat("POST /api/chat (generate quiz)", "generate quiz")
+
+    def run(self):
+        for step in self.scenario["steps"]:
+            action = getattr(self, step["action"])
+            for _ in range(step.get("repeat", 1)):
+                if self.rng.random() > step.get("probability", 1.0):
+                    continue
+                if step["action"] not in ("register_login", "upload") and not self.session_id:
+                    return
+                action(step)
+                self._think()
+
+
+def run_scenario(base_url: str, scenario: dict, users: int, seed: int) -> dict:
+    deck = build_deck(scenario.get("deck_slides", 30), seed)
+    recorder = Recorder()
+    ramp = scenario.get("ramp_up_s", 0)
+    threads = []
+    started = time.perf_counter()
+    for i in range(users):
+        user = VirtualUser(base_url, deck, scenario, recorder, random.Random(f"{seed}:{i}"))
+        t = threading.Thread(target=user.run, name=f"vu-{i}", daemon=True)
+        t.start()
+        threads.append(t)
+        if ramp and users > 1:
+            time.sleep(ramp / (users - 1))
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    report = {"scenario": scenario.get("name"), "users": users, "wall_s": round(wall, 3), "endpoints": {}}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        samples.sort()
+        n = len(samples)
+        report["endpoints"][endpoint] = {
+            "requests": n,
+            "errors": recorder.errors[endpoint],
+            "error_rate": round(recorder.errors[endpoint] / n, 4) if n else 0.0,
+            "throughput_rps": round(n / wall, 3) if wall else 0.0,
+            "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"\nscenario {report['scenario']}: {report['users']} users, {report['wall_s']} s wall time\n")
+    header = f"{'endpoint':<34}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, r in report["endpoints"].items():
+        print(f"{endpoint:<34}{r['requests']:>7}{r['error_rate'] * 100:>7.1f}%{r['throughput_rps']:>9.2f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+def _start_app(port: int, llm_url: str, stub_latency_ms: float, workers: int):
+    env = dict(
+        os.environ,
+        MODEL_BACKEND="stub",
+        STUB_MODEL_LATENCY_MS=str(stub_latency_ms),
+        OPENAI_BASE_URL=llm_url,
+        OPENAI_API_KEY="loadtest",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port), "--workers", str(workers)],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            requests.get(url + "/metrics", timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("app did not start within 60s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, help="override the scenario's user count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-app", action="store_true", help="start a fake LLM and a stubbed app locally")
+    parser.add_argument("--app-port", type=int, default=8077)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0, help="simulated local model time")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario, encoding="utf-8") as fh:
+        scenario = json.load(fh)
+    users = args.users or scenario.get("users", 10)
+
+    proc = llm = None
+    base_url = args.base_url
+    if args.start_app:
+        llm, llm_url = start_server(0, args.llm_latency_ms)
+        proc, base_url = _start_app(args.app_port, llm_url, args.stub_latency_ms, args.app_workers)
+    try:
+        report = run_scenario(base_url, scenario, users, args.seed)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if llm:
+            llm.shutdown()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Run the benchmark suite and compare against a stored JSON baseline.
+
+    python -m benchmarks.run                    # full suite, stub models
+    python -m benchmarks.run --quick            # 10/50-slide decks only
+    python -m benchmarks.run --update-baseline  # record the current numbers
+    python -m benchmarks.run --summarizer hf    # real models (slow)
+
+Exits with status 1 when any case's median is slower than its baseline by more
+than the allowed threshold (default 20%, overridable per case in the baseline),
+when the baseline file is missing, or when a recorded baseline lacks a result
+for a case that has a threshold. A baseline without any results only reports
+that nothing was compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "baseline.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="only the 10 and 50 slide decks")
+    parser.add_argument("--filter", help="only run cases whose name contains this string")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--summarizer", choices=("stub", "hf"), default="stub")
+    parser.add_argument("--summarizer-model", help="checkpoint to use with --summarizer hf")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--output", help="also write results JSON here")
+    return parser.parse_args(argv)
+
+
+def time_case(fn, repeats: int) -> dict:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p95_index = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+    return {
+        "median_s": statistics.median(samples),
+        "p95_s": samples[p95_index],
+        "min_s": samples[0],
+        "mean_s": statistics.fmean(samples),
+        "repeats": repeats,
+    }
+
+
+def compare(results: dict, baseline: dict, default_threshold: float) -> list[str]:
+    regressions = []
+    thresholds = baseline.get("thresholds", {})
+    for name, res in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        limit = base["median_s"] * (1 + thresholds.get(name, default_threshold))
+        if res["median_s"] > limit:
+            regressions.append(
+                f"{name}: median {res['median_s'] * 1000:.2f} ms > {limit * 1000:.2f} ms "
+                f"(baseline {base['median_s'] * 1000:.2f} ms)"
+            )
+    return regressions
+
+
+def unbaselined(results: dict, baseline: dict) -> list[str]:
+    """Cases that carry a threshold but have no recorded result to compare against."""
+    recorded = baseline.get("results", {})
+    return sorted(name for name in results if name in baseline.get("thresholds", {}) and name not in recorded)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Model and API settings must be in place before backend modules are imported.
+    os.environ["MODEL_BACKEND"] = args.summarizer
+    if args.summarizer_model:
+        os.environ["SUMMARIZER_MODEL"] = args.summarizer_model
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-unused")
+    # The endpoint cases time requests, not admission control; every TestClient
+    # shares one client address and would otherwise run out of rate-limit tokens.
+    os.environ["RATE_LIMIT_PER_MINUTE"] = "1000000"
+    os.environ["RATE_LIMIT_BURST"] = "1000000"
+
+    from .cases import database_available, selected_cases
+
+    skip = set()
+    if args.skip_endpoints:
+        skip.add("endpoints")
+    elif not database_available():
+        print("! database unreachable (DATABASE_URL); skipping endpoint benchmarks", file=sys.stderr)
+        skip.add("endpoints")
+
+    results = {}
+    for name, group, setup in selected_cases(args.quick, args.filter, skip):
+        fn = setup()
+        res = time_case(fn, args.repeats)
+        results[name] = res
+        print(f"{name:<40} median {res['median_s'] * 1000:10.2f} ms   p95 {res['p95_s'] * 1000:10.2f} ms")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "summarizer": args.summarizer,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as fh:
+                previous = json.load(fh)
+        report["thresholds"] = previous.get("thresholds", {})
+        report["results"] = {**previous.get("results", {}), **results}
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"! no baseline at {args.baseline}; run with --update-baseline to record one", file=sys.stderr)
+        return 1
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("meta", {}).get("summarizer") != args.summarizer:
+        print("! baseline was recorded with a different summarizer; comparison skipped", file=sys.stderr)
+        return 0
+    if not baseline.get("results"):
+        print(f"no baseline results in {args.baseline}; run with --update-baseline to record them", file=sys.stderr)
+        return 0
+    missing = unbaselined(results, baseline)
+    for name in missing:
+        print(f"MISSING BASELINE {name}: no recorded result to compare against", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
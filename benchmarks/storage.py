@@ -0,0 +1,98 @@
+"""Bytes stored per deck under each storage layout, and slide-text read latency.
+
+    python -m benchmarks.storage
+    python -m benchmarks.storage --sizes 10 200 --output storage.json
+
+Sizes are the logical column bytes written per deck, before Postgres applies
+its own TOAST compression:
+
+  legacy    session pptx_text + summary_text + slides_payload, summary copy
+  slides    per-slide rows with inline text, plus the same session/summary copies
+  compact   slides rows without text, compressed slide_blobs, and a summary
+            snapshot (bullets inline, text by content hash)
+
+Read latency is the time to turn one deck's blobs back into slide text.
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+
+from .corpus import DECK_SIZES, build_deck
+
+
+def _json_bytes(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _utf8(text: str | None) -> int:
+    return len((text or "").encode("utf-8"))
+
+
+def measure(n_slides: int, repeats: int) -> dict:
+    from backend.blobs import BLOB_CODEC, decode
+    from backend.pptx_text import extract_text_by_slide
+    from backend.slides import content_hash, format_summary, slide_blob_rows, summary_snapshot
+
+    slides = extract_text_by_slide(io.BytesIO(build_deck(n_slides)))
+    payload = [dict(s, bullets=[ln for ln in s["text"].split("\n") if ln][:3] or [s["title"]]) for s in slides]
+    pptx_text = " ".join(s["text"] for s in payload)
+    summary_text = format_summary(payload)
+
+    legacy = _utf8(pptx_text) + 2 * _utf8(summary_text) + 2 * _json_bytes(payload)
+    rows_inline = sum(
+        _utf8(s["title"]) + _utf8(s["text"]) + _json_bytes(s["bullets"]) + 64 for s in payload
+    )
+    slides_layout = rows_inline + _utf8(pptx_text) + 2 * _utf8(summary_text) + _json_bytes(payload)
+    blobs = {b["content_hash"]: b for b in slide_blob_rows(payload)}
+    rows_compact = sum(_utf8(s["title"]) + _json_bytes(s["bullets"]) + 64 for s in payload)
+    compact = (
+        rows_compact + sum(len(b["data"]) + 64 for b in blobs.values())
+        + _utf8(summary_text) + _json_bytes(summary_snapshot(payload))
+    )
+
+    hashes = [content_hash(s["title"], s["text"]) for s in payload]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for h in hashes:
+            b = blobs[h]
+            decode(b["codec"], b["data"])
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "slides": n_slides,
+        "codec": BLOB_CODEC,
+        "legacy_bytes": legacy,
+        "slides_bytes": slides_layout,
+        "compact_bytes": compact,
+        "compact_ratio": round(compact / legacy, 3) if legacy else None,
+        "read_ms_p50": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DECK_SIZES))
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(n, args.repeats) for n in args.sizes]
+    header = f"{'slides':>7}{'legacy B':>12}{'slides B':>12}{'compact B':>12}{'ratio':>8}{'read ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['slides']:>7}{r['legacy_bytes']:>12}{r['slides_bytes']:>12}{r['compact_bytes']:>12}"
+              f"{r['compact_ratio']:>8}{r['read_ms_p50']:>10.3f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
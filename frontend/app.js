@@ -9,6 +9,7 @@ let currentUser = null;
 let courses = [];
 let selectedCourseId = Number(localStorage.getItem("als_course_id")) || null;
 let savedSummaries = [];
+let summariesCursor = null;
 
 const messagesDiv = document.getElementById("messages");
 const sendBtn = document.getElementById("sendBtn");
@@ -318,26 +319,17 @@ async function createQuiz() {
     return;
   }
 
-  // 1. Get context for this session
-  const resCtx = await fetch(`/api/debug/session/${sessionId}`);
-  const sessData = await resCtx.json();
-  const text = sessData.summary || sessData.pptx_text_preview || "";
-  if (!text.trim()) {
-    appendMessage("⚠️ Could not load lecture content for this session.", "ai");
-    return;
-  }
-
-  // 2. Build headers (include token!)
+  // 1. Build headers (include token!)
   const headers = { "Content-Type": "application/json" };
   if (authToken) {
     headers["Authorization"] = `Bearer ${authToken}`;
   }
 
-  // 3. Call quiz endpoint
+  // 2. Call quiz endpoint; the server reads the lecture from the session
   const res = await fetch(`/api/quizzes/${selectedCourseId}`, {
     method: "POST",
     headers,
-    body: JSON.stringify({ session_text: text }),
+    body: JSON.stringify({ session_id: sessionId }),
   });
 
   if (!res.ok) {
@@ -352,7 +344,7 @@ async function createQuiz() {
   const data = await res.json();
   appendMessage("📝 Quiz generated:\n\n" + data.content, "ai");
 
-  // 4. Refresh quiz list in the sidebar
+  // 3. Refresh quiz list in the sidebar
   loadQuizzes(selectedCourseId);
 }
 
@@ -368,15 +360,6 @@ async function createAssignment() {
     return;
   }
 
-  // Fetch context from backend debug endpoint (same idea as createQuiz)
-  const resCtx = await fetch(`/api/debug/session/${sessionId}`);
-  const sessData = await resCtx.json();
-  const text = sessData.summary || sessData.pptx_text_preview || "";
-  if (!text.trim()) {
-    appendMessage("⚠️ Could not load lecture content for this session.", "ai");
-    return;
-  }
-
   const headers = { "Content-Type": "application/json" };
   if (authToken) {
     headers["Authorization"] = `Bearer ${authToken}`;
@@ -385,9 +368,17 @@ async function createAssignment() {
   const res = await fetch(`/api/assignments/${selectedCourseId}`, {
     method: "POST",
     headers,
-    body: JSON.stringify({ session_text: text }),
+    body: JSON.stringify({ session_id: sessionId }),
   });
 
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    appendMessage(
+      `❌ Failed to generate assignment: ${err.detail || res.statusText}`,
+      "ai"
+    );
+    return;
+  }
 
   const data = await res.json();
 
@@ -405,7 +396,7 @@ async function loadAssignments(courseId) {
   }
 
   const res = await fetch(`/api/courses/${courseId}/assignments`, { headers });
-  const assignments = await res.json();
+  const assignments = res.ok ? (await res.json()).items : [];
 
   if (!assignments.length) {
     assignmentList.innerHTML = "";
@@ -430,7 +421,7 @@ async function loadQuizzes(courseId) {
   }
 
   const res = await fetch(`/api/courses/${courseId}/quizzes`, { headers });
-  const quizzes = await res.json();
+  const quizzes = res.ok ? (await res.json()).items : [];
 
   if (!quizzes.length) {
     quizList.innerHTML = "";
@@ -600,21 +591,27 @@ function setSelectedCourse(id) {
   fetchSummaries();
 }
 
-async function fetchSummaries() {
+async function fetchSummaries(append = false) {
   if (!currentUser || !selectedCourseId) {
     savedSummaries = [];
+    summariesCursor = null;
     renderSummaryList();
     return;
   }
-  const res = await fetch(`/api/summaries?course_id=${selectedCourseId}`, {
+  const params = new URLSearchParams({ course_id: selectedCourseId });
+  if (append && summariesCursor) params.set("cursor", summariesCursor);
+  const res = await fetch(`/api/summaries?${params}`, {
     headers: { Authorization: `Bearer ${authToken}` },
   });
   if (!res.ok) {
     savedSummaries = [];
+    summariesCursor = null;
     renderSummaryList();
     return;
   }
-  savedSummaries = await res.json();
+  const page = await res.json();
+  savedSummaries = append ? savedSummaries.concat(page.items) : page.items;
+  summariesCursor = page.next_cursor;
   renderSummaryList();
 }
 
@@ -644,9 +641,23 @@ function renderSummaryList() {
     li.onclick = () => showSummaryInChat(summary);
     summaryList.appendChild(li);
   });
+  if (summariesCursor) {
+    const more = document.createElement("li");
+    more.textContent = "Load more…";
+    more.onclick = () => fetchSummaries(true);
+    summaryList.appendChild(more);
+  }
 }
 
-function showSummaryInChat(summary) {
+async function showSummaryInChat(item) {
+  const res = await fetch(`/api/summaries/${item.id}`, {
+    headers: { Authorization: `Bearer ${authToken}` },
+  });
+  if (!res.ok) {
+    appendMessage("⚠️ Could not load this summary.", "ai");
+    return;
+  }
+  const summary = await res.json();
   messagesDiv.innerHTML = "";
   appendMessage(`📚 Saved summary: ${summary.title || "Untitled deck"}`, "ai");
   const slides = summary.slides_payload || [];
@@ -681,7 +692,71 @@ async function persistSummary(sessionIdValue, slides, fileName) {
   await fetchSummaries();
 }
 
+// Follow-up questions go over one WebSocket per session: auth and session
+// lookup happen once, and replies are matched to messages by id.
+let chatSocket = null;
+let chatSocketKey = null;
+let chatSocketReady = null;
+let chatMessageSeq = 0;
+const chatPending = new Map();
+
+function openChatSocket() {
+  const key = `${sessionId}|${authToken}`;
+  if (chatSocket && chatSocketKey === key && chatSocket.readyState <= WebSocket.OPEN) {
+    return chatSocketReady;
+  }
+  if (chatSocket) chatSocket.close();
+
+  const ws = new WebSocket(`${API_BASE.replace(/^http/, "ws")}/ws/chat/${encodeURIComponent(sessionId)}`);
+  chatSocket = ws;
+  chatSocketKey = key;
+  chatSocketReady = new Promise((resolve, reject) => {
+    ws.onopen = () => ws.send(JSON.stringify({ type: "auth", token: authToken || null }));
+    ws.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      if (frame.type === "ready") {
+        resolve(ws);
+        return;
+      }
+      const pending = chatPending.get(frame.id);
+      if (!pending || frame.type === "progress") return;
+      chatPending.delete(frame.id);
+      if (frame.type === "response") {
+        pending.resolve(frame);
+      } else {
+        pending.reject(new Error(`Server error (${frame.status}): ${frame.detail}`));
+      }
+    };
+    ws.onclose = (event) => {
+      reject(new Error(event.reason || "Chat connection closed"));
+      for (const pending of chatPending.values()) {
+        pending.reject(new Error("Chat connection closed"));
+      }
+      chatPending.clear();
+      if (chatSocket === ws) chatSocket = null;
+    };
+  });
+  return chatSocketReady;
+}
+
+function sendOverSocket(ws, message) {
+  const id = ++chatMessageSeq;
+  return new Promise((resolve, reject) => {
+    chatPending.set(id, { resolve, reject });
+    ws.send(JSON.stringify({ type: "message", id, message }));
+  });
+}
+
 async function sendToBackend({ message, file }) {
+  if (!file && sessionId && "WebSocket" in window) {
+    // fall back to POST /api/chat only if the socket cannot be opened
+    const ws = await openChatSocket().catch(() => null);
+    if (ws) {
+      const data = await sendOverSocket(ws, message);
+      return { text: data.response || "(no response)", usedSlides: data.used_slides || [] };
+    }
+  }
+
   const formData = new FormData();
   formData.append("message", message || "Summarize this presentation");
 
@@ -732,10 +807,12 @@ fileInput.addEventListener("change", async () => {
   setProgress(5, "Uploading & extracting slides…");
   const form1 = new FormData();
   form1.append("file", file);
-  const r1 = await fetch("/api/extract", { method: "POST", body: form1 });
-  const d1 = await r1.json();
-  if (d1.error) {
-    renderSlideCard("-", "Error", [d1.error]);
+  const headers = {};
+  if (authToken) headers["Authorization"] = `Bearer ${authToken}`;
+  const r1 = await fetch("/api/extract", { method: "POST", body: form1, headers });
+  const d1 = await r1.json().catch(() => ({}));
+  if (!r1.ok || d1.error) {
+    renderSlideCard("-", "Error", [d1.error || d1.detail || `Upload failed (${r1.status})`]);
     fileInput.value = "";
     return;
   }
@@ -752,8 +829,15 @@ fileInput.addEventListener("change", async () => {
     form2.append("page", s.page);
     form2.append("title", s.title || "");
     form2.append("text", s.text || "");
-    const r2 = await fetch("/api/summarize/slide", { method: "POST", body: form2 });
-    const d2 = await r2.json();
+    const r2 = await fetch("/api/summarize/slide", { method: "POST", body: form2, headers });
+    const d2 = await r2.json().catch(() => ({}));
+    if (!r2.ok) {
+      const retry = r2.headers.get("Retry-After");
+      const detail = d2.detail || r2.statusText;
+      renderSlideCard(s.page, s.title, [`⚠️ Could not summarize this slide: ${detail}${retry ? ` (retry in ${retry}s)` : ""}`]);
+      slides[i].bullets = [];
+      continue;
+    }
     slides[i].bullets = d2.bullets || [];
     renderSlideCard(d2.page, d2.title, d2.bullets || []);
   }
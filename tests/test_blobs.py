@@ -0,0 +1,40 @@
+import zlib
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from backend.blobs import BLOB_COMPRESS_MIN_BYTES, CODEC_RAW, CODEC_ZLIB, blob_row, decode, encode
+
+
+def test_short_text_is_stored_raw():
+    codec, data = encode("Intro")
+    assert codec == CODEC_RAW
+    assert decode(codec, data) == "Intro"
+
+
+def test_long_text_is_compressed_and_round_trips():
+    text = "Merge sort splits the input, sorts each half and merges them. " * 40
+    assert len(text) > BLOB_COMPRESS_MIN_BYTES
+    codec, data = encode(text)
+    assert codec != CODEC_RAW
+    assert len(data) < len(text)
+    assert decode(codec, data) == text
+
+
+def test_unicode_round_trips():
+    text = "Übersicht • Σ x² — 学習 " * 30
+    assert decode(*encode(text)) == text
+
+
+def test_zlib_rows_stay_readable():
+    text = "legacy slide text " * 50
+    assert decode(CODEC_ZLIB, zlib.compress(text.encode("utf-8"))) == text
+
+
+def test_blob_row_records_raw_size():
+    row = blob_row("abc", "héllo")
+    assert row["content_hash"] == "abc"
+    assert row["raw_size"] == len("héllo".encode("utf-8"))
+    assert decode(row["codec"], row["data"]) == "héllo"
+    assert decode(*encode(None)) == ""
@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("sqlalchemy")
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from backend.caching import is_not_modified, make_etag, not_modified, set_cache_headers
+
+
+app = FastAPI()
+VERSION = {"value": "v1"}
+
+
+@app.get("/item")
+def read_item(request: Request, response: Response):
+    etag = make_etag("item", 1, VERSION["value"])
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    return {"id": 1, "version": VERSION["value"]}
+
+
+@pytest.fixture
+def client():
+    VERSION["value"] = "v1"
+    return TestClient(app)
+
+
+def test_first_response_carries_validators(client):
+    r = client.get("/item")
+    assert r.status_code == 200
+    assert r.headers["etag"] == make_etag("item", 1, "v1")
+    assert r.headers["cache-control"] == "private, no-cache"
+    assert r.headers["vary"] == "Authorization"
+
+
+def test_matching_if_none_match_is_a_304(client):
+    etag = client.get("/item").headers["etag"]
+    r = client.get("/item", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("header", ['"stale", {etag}', "*"])
+def test_etag_lists_and_wildcard_match(client, header):
+    etag = client.get("/item").headers["etag"]
+    assert client.get("/item", headers={"If-None-Match": header.format(etag=etag)}).status_code == 304
+
+
+def test_new_version_changes_the_etag(client):
+    etag = client.get("/item").headers["etag"]
+    VERSION["value"] = "v2"
+    r = client.get("/item", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
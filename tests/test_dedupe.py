@@ -0,0 +1,52 @@
+from backend.dedupe import find_near_duplicates, jaccard, shingles
+
+
+SCHEDULING = (
+    "The scheduler decides which runnable thread gets the CPU next, "
+    "balancing throughput against latency and fairness between processes."
+)
+MEMORY = (
+    "Virtual memory maps the pages of a process address space onto physical "
+    "frames using page tables and a translation lookaside buffer."
+)
+
+
+def test_lightly_edited_copy_maps_to_the_earlier_slide():
+    slides = [
+        {"page": 1, "title": "Scheduling", "text": SCHEDULING},
+        {"page": 2, "title": "Memory", "text": MEMORY},
+        {"page": 3, "title": "Scheduling", "text": SCHEDULING + " Recap."},
+    ]
+    assert find_near_duplicates(slides) == {3: 1}
+
+
+def test_chains_resolve_to_the_earliest_twin():
+    slides = [
+        {"page": 1, "title": "Scheduling", "text": SCHEDULING},
+        {"page": 2, "title": "Scheduling", "text": SCHEDULING + " Recap."},
+        {"page": 3, "title": "Scheduling", "text": SCHEDULING + " Recap."},
+    ]
+    assert find_near_duplicates(slides) == {2: 1, 3: 1}
+
+
+def test_unrelated_and_tiny_slides_are_not_duplicates():
+    slides = [
+        {"page": 1, "title": "Scheduling", "text": SCHEDULING},
+        {"page": 2, "title": "Memory", "text": MEMORY},
+        {"page": 3, "title": "Questions", "text": ""},
+        {"page": 4, "title": "Questions", "text": ""},
+    ]
+    assert find_near_duplicates(slides) == {}
+
+
+def test_threshold_outside_range_disables_detection():
+    slides = [{"page": 1, "title": "A", "text": SCHEDULING}, {"page": 2, "title": "A", "text": SCHEDULING}]
+    assert find_near_duplicates(slides, threshold=0) == {}
+    assert find_near_duplicates(slides, threshold=1.5) == {}
+
+
+def test_shingles_and_jaccard():
+    assert shingles("Merge sort splits", k=2) == {"merge sort", "sort splits"}
+    assert shingles("one", k=2) == {"one"}
+    assert jaccard({"a", "b"}, {"b", "c"}) == 1 / 3
+    assert jaccard(set(), set()) == 0.0
@@ -0,0 +1,64 @@
+import pytest
+
+from backend.intents import (
+    EXPLAIN_SLIDE,
+    QUESTION,
+    QUIZ,
+    SLIDE_BULLETS,
+    SLIDE_COUNT,
+    SLIDE_TEXT,
+    SLIDE_TITLE,
+    SLIDE_TITLES,
+    classify,
+    route,
+)
+
+
+SLIDES = [
+    {"page": 1, "title": "Intro", "text": "Welcome to the course", "bullets": ["Course overview."]},
+    {"page": 2, "title": "Sorting", "text": "Merge sort splits the input", "bullets": []},
+]
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("how many slides are there", (SLIDE_COUNT, None)),
+    ("How many slides?", (SLIDE_COUNT, None)),
+    ("number of slides", (SLIDE_COUNT, None)),
+    ("list slide titles", (SLIDE_TITLES, None)),
+    ("show me all the slide titles", (SLIDE_TITLES, None)),
+    ("table of contents", (SLIDE_TITLES, None)),
+    ("show bullets of slide 4", (SLIDE_BULLETS, 4)),
+    ("summary of slide 2", (SLIDE_BULLETS, 2)),
+    ("what is the title of slide 3?", (SLIDE_TITLE, 3)),
+    ("what's slide 3 called", (SLIDE_TITLE, 3)),
+    ("show the text of slide 5", (SLIDE_TEXT, 5)),
+    ("generate quiz", (QUIZ, None)),
+    ("explain slide 2", (EXPLAIN_SLIDE, 2)),
+])
+def test_structural_messages(message, expected):
+    assert classify(message) == expected
+
+
+@pytest.mark.parametrize("message, expected", [
+    # keywords with extra content words are real questions
+    ("How many slides talk about recursion?", (QUESTION, None)),
+    ("list slides about sorting", (QUESTION, None)),
+    ("what does the summary on slide 2 miss?", (EXPLAIN_SLIDE, 2)),
+    ("Is slide 3 called the intro?", (EXPLAIN_SLIDE, 3)),
+    ("what is gradient descent and why is it used", (QUESTION, None)),
+])
+def test_questions_reach_the_model(message, expected):
+    assert classify(message) == expected
+
+
+def test_route_answers_structural_queries_without_a_model():
+    assert route("how many slides are there", SLIDES).answer == "📊 This deck has 2 slides."
+    assert "1. Intro" in route("list slide titles", SLIDES).answer
+    assert "Course overview." in route("bullets of slide 1", SLIDES).answer
+    assert "not found" in route("title of slide 9", SLIDES).answer
+
+
+def test_route_falls_back_when_slide_is_not_summarized():
+    routed = route("bullets of slide 2", SLIDES)
+    assert routed.intent == EXPLAIN_SLIDE
+    assert routed.answer is None
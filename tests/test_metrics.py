@@ -0,0 +1,36 @@
+import pytest
+
+from backend import metrics, profiling
+
+
+def test_metrics_are_open_without_a_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    assert metrics.metrics_allowed(None)
+
+
+@pytest.mark.parametrize("authorization, allowed", [
+    (None, False),
+    ("", False),
+    ("Bearer wrong", False),
+    ("Basic s3cret", False),
+    ("s3cret", False),
+    ("Bearer s3cret", True),
+    ("bearer s3cret", True),
+])
+def test_metrics_token_is_required_once_set(monkeypatch, authorization, allowed):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    assert metrics.metrics_allowed(authorization) is allowed
+
+
+def test_diagnostics_are_off_without_a_profiling_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    assert not profiling.profiling_allowed("")
+    assert not profiling.profiling_allowed("anything")
+
+
+def test_diagnostics_need_the_exact_profiling_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "admin-token")
+    assert profiling.profiling_allowed("admin-token")
+    assert not profiling.profiling_allowed("admin")
+    assert not profiling.profiling_allowed(None)
+
@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from backend.scheduler import BACKGROUND, BULK, INTERACTIVE, FairScheduler, RateLimiter, TokenBucket
+
+
+def _order(scheduler: FairScheduler, n: int) -> list:
+    # workers=0, so jobs are only taken off the queues here
+    return [scheduler._next_job().args[0] for _ in range(n)]
+
+
+def test_higher_priority_classes_run_first():
+    s = FairScheduler(workers=0, aging_seconds=0)
+    s.submit("u1", BACKGROUND, str, "digest")
+    s.submit("u1", BULK, str, "summarize")
+    s.submit("u2", INTERACTIVE, str, "chat")
+    assert _order(s, 3) == ["chat", "summarize", "digest"]
+
+
+def test_keys_take_turns_within_a_class():
+    s = FairScheduler(workers=0, aging_seconds=0)
+    for page in (1, 2, 3):
+        s.submit("heavy", BULK, str, f"heavy-{page}")
+    s.submit("light", BULK, str, "light-1")
+    assert _order(s, 4) == ["heavy-1", "light-1", "heavy-2", "heavy-3"]
+
+
+def test_aged_job_is_served_ahead_of_newer_higher_priority_work():
+    s = FairScheduler(workers=0, aging_seconds=30)
+    s.submit("u1", BULK, str, "old-bulk")
+    s.submit("u1", BULK, str, "new-bulk")
+    s._classes[BULK].queues["u1"][0].enqueued -= 31
+    s.submit("u2", INTERACTIVE, str, "chat")
+    assert _order(s, 3) == ["old-bulk", "chat", "new-bulk"]
+
+
+def test_queue_is_capped_per_key():
+    s = FairScheduler(workers=0, max_queued_per_key=2)
+    s.submit("u1", BULK, str, "a")
+    s.submit("u1", BULK, str, "b")
+    with pytest.raises(HTTPException) as exc:
+        s.submit("u1", BULK, str, "c")
+    assert exc.value.status_code == 429
+    s.submit("u2", BULK, str, "other users are unaffected")
+
+
+def test_scheduler_runs_jobs():
+    s = FairScheduler(workers=1)
+    assert s.submit("u1", INTERACTIVE, sum, [1, 2, 3]).result(timeout=5) == 6
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(1.0, abs=0.05)
+    bucket.updated -= 1.0  # a second passes
+    assert bucket.take() == 0
+
+
+def test_rate_limiter_rejects_with_retry_after():
+    limiter = RateLimiter(per_minute=60, burst=2)
+    limiter.check("user:1")
+    limiter.check("user:1")
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("user:1")
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+    limiter.check("user:2")
+
+
+def test_rate_limiter_charges_fractional_costs():
+    limiter = RateLimiter(per_minute=1, burst=1)
+    for _ in range(4):
+        limiter.check("ip:10.0.0.1", cost=0.25)
+    with pytest.raises(HTTPException):
+        limiter.check("ip:10.0.0.1", cost=0.25)
@@ -0,0 +1,77 @@
+import hashlib
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("multipart")
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.uploads import UploadSizeLimit, spool_upload
+
+
+LIMIT = 4096
+BOUNDARY = "test-boundary"
+
+app = FastAPI()
+app.add_middleware(UploadSizeLimit, max_bytes=LIMIT)
+
+
+@app.post("/upload")
+async def upload(file: UploadFile = File(...)):
+    spooled = await spool_upload(file)
+    try:
+        return {"size": spooled.size, "sha256": spooled.sha256, "same_file": spooled.spool is file.file}
+    finally:
+        spooled.close()
+
+
+def _multipart(payload: bytes, chunk: int = 512):
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="deck.pptx"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    for i in range(0, len(payload), chunk):
+        yield payload[i:i + chunk]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_upload_under_the_limit_is_hashed_without_a_second_copy(client):
+    data = b"pptx bytes " * 100
+    r = client.post("/upload", files={"file": ("deck.pptx", data, "application/octet-stream")})
+    assert r.status_code == 200
+    assert r.json() == {"size": len(data), "sha256": hashlib.sha256(data).hexdigest(), "same_file": True}
+
+
+def test_oversized_content_length_is_rejected_up_front(client):
+    r = client.post("/upload", files={"file": ("deck.pptx", b"x" * (LIMIT * 2), "application/octet-stream")})
+    assert r.status_code == 413
+
+
+def test_oversized_chunked_body_is_rejected_while_streaming(client):
+    r = client.post(
+        "/upload",
+        content=_multipart(b"x" * (LIMIT * 2)),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert "content-length" not in r.request.headers
+    assert r.status_code == 413
+
+
+def test_chunked_body_under_the_limit_is_accepted(client):
+    data = b"y" * 1000
+    r = client.post(
+        "/upload",
+        content=_multipart(data),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert r.status_code == 200
+    assert r.json()["sha256"] == hashlib.sha256(data).hexdigest()